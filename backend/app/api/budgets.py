@@ -0,0 +1,42 @@
+"""Per-route SQL statement and memory budgets."""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any, TypeVar
+
+Endpoint = TypeVar("Endpoint", bound=Callable[..., Any])
+
+_BUDGET_ATTRIBUTE = "__route_budget__"
+
+
+@dataclass(frozen=True)
+class RouteBudget:
+    """Upper bounds for one request to a route against the seeded dataset.
+
+    ``queries`` counts SQL statements sent to any engine; ``peak_kib`` is the
+    peak of memory allocated while the request runs, as seen by tracemalloc.
+    """
+
+    queries: int
+    peak_kib: int
+
+
+def route_budget(queries: int, peak_kib: int) -> Callable[[Endpoint], Endpoint]:
+    """Declare the budget of an endpoint; apply it below the route decorator.
+
+    Budgets are checked by ``python -m benchmarks.check_route_budgets``.
+    """
+
+    def declare(endpoint: Endpoint) -> Endpoint:
+        setattr(endpoint, _BUDGET_ATTRIBUTE, RouteBudget(queries, peak_kib))
+        return endpoint
+
+    return declare
+
+
+def get_route_budget(endpoint: Callable[..., Any]) -> RouteBudget | None:
+    """Return the budget declared for an endpoint, if any."""
+
+    return getattr(endpoint, _BUDGET_ATTRIBUTE, None)
@@ -2,29 +2,53 @@
 
 from __future__ import annotations
 
-from fastapi import Depends, HTTPException, status
+import secrets
+
+from fastapi import Depends, Header, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from app.core.config import get_settings
-from app.db.session import SessionLocal
+from app.db.shards import get_shard_router
+from app.models.outlet import Outlet
 from app.models.user import User
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login", auto_error=False)
+
 
+def get_db(token: str | None = Depends(optional_oauth2_scheme)) -> Session:
+    """Yield a database session on the shard of the authenticated partner.
 
-def get_db() -> Session:
-    """Yield a database session."""
+    Anonymous requests and tokens without a partner claim use the default
+    shard; invalid tokens are rejected later by ``get_current_user``.
+    """
 
-    db = SessionLocal()
+    db = get_shard_router().session_for_partner(_token_partner_id(token))
     try:
         yield db
     finally:
         db.close()
 
 
+def _token_partner_id(token: str | None) -> int | None:
+    """Return the partner claim of a token without enforcing validity."""
+
+    if token is None:
+        return None
+    settings = get_settings()
+    try:
+        payload = jwt.decode(
+            token, settings.jwt_secret_key, algorithms=[settings.jwt_algorithm]
+        )
+    except JWTError:
+        return None
+    partner_id = payload.get("pid")
+    return partner_id if isinstance(partner_id, int) else None
+
+
 def get_current_user(
     token: str = Depends(oauth2_scheme),
     db: Session = Depends(get_db),
@@ -53,3 +77,30 @@ def get_current_user(
         raise credentials_exception
 
     return user
+
+
+def get_current_outlet_id(
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+) -> int | None:
+    """Return the outlet shown to the current user, if the partner has one."""
+
+    return db.scalar(
+        select(Outlet.id)
+        .where(Outlet.partner_id == current_user.partner_id)
+        .order_by(Outlet.id)
+        .limit(1)
+    )
+
+
+def require_admin_key(x_admin_key: str | None = Header(default=None)) -> None:
+    """Reject requests without the configured ``ADMIN_API_KEY``.
+
+    Administrative endpoints stay closed while no key is configured.
+    """
+
+    expected = get_settings().admin_api_key
+    if not expected or not secrets.compare_digest(
+        (x_admin_key or "").encode(), expected.encode()
+    ):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
@@ -4,10 +4,21 @@ from __future__ import annotations
 
 from fastapi import APIRouter
 
-from app.api.routes import auth, charts, dashboard, franchise
+from app.api.routes import (
+    admin,
+    auth,
+    charts,
+    dashboard,
+    franchise,
+    reports,
+    search,
+)
 
 api_router = APIRouter()
 api_router.include_router(auth.router, prefix="/auth", tags=["auth"])
 api_router.include_router(dashboard.router, prefix="/dashboard", tags=["dashboard"])
 api_router.include_router(franchise.router, prefix="/franchise", tags=["franchise"])
 api_router.include_router(charts.router, prefix="/charts", tags=["charts"])
+api_router.include_router(reports.router, prefix="/reports", tags=["reports"])
+api_router.include_router(search.router, prefix="/search", tags=["search"])
+api_router.include_router(admin.router, prefix="/admin", tags=["admin"])
@@ -0,0 +1,29 @@
+"""Administrative endpoints."""
+
+from __future__ import annotations
+
+from fastapi import APIRouter, Depends, status
+
+from app.api.budgets import route_budget
+from app.api.deps import require_admin_key
+from app.db.shards import get_shard_router
+from app.schemas.provisioning import ProvisionReport, ProvisionRequest
+from app.services.provisioning import provision
+
+router = APIRouter(dependencies=[Depends(require_admin_key)])
+
+
+@router.post(
+    "/provision",
+    response_model=ProvisionReport,
+    status_code=status.HTTP_201_CREATED,
+)
+@route_budget(queries=8, peak_kib=512)
+def provision_accounts(payload: ProvisionRequest) -> ProvisionReport:
+    """Create partners, outlets and users in bulk on their partners' shards.
+
+    Shards are resolved from the payload's partners, not from any bearer
+    token sent with the request.
+    """
+
+    return provision(get_shard_router(), payload)
@@ -5,58 +5,82 @@ from __future__ import annotations
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
-from app.api.deps import get_current_user, get_db
+from app.api.budgets import route_budget
+from app.api.deps import get_current_outlet_id, get_current_user, get_db
 from app.core.security import create_access_token, get_password_hash, verify_password
+from app.db.shards import DEFAULT_SHARD, get_shard_router
+from app.models.outlet import Outlet
 from app.models.user import User
 from app.schemas.auth import Token
 from app.schemas.user import OutletInfo, PartnerInfo, UserCreate, UserProfile, UserRead
+from app.services.user_directory import claim_emails, partner_for_email, release_emails
 
 router = APIRouter()
 
 
 @router.post("/register", response_model=UserRead, status_code=status.HTTP_201_CREATED)
-def register_user(payload: UserCreate, db: Session = Depends(get_db)) -> UserRead:
-    """Register a new user."""
-
-    existing = db.scalar(select(User).where(User.email == payload.email))
-    if existing is not None:
-        raise HTTPException(status_code=400, detail="Email already registered")
-
-    user = User(
-        email=payload.email,
-        full_name=payload.full_name,
-        hashed_password=get_password_hash(payload.password),
-        partner_id=1,
-    )
-    db.add(user)
-    db.commit()
-    db.refresh(user)
-    return UserRead(id=user.id, email=user.email, full_name=user.full_name)
+@route_budget(queries=3, peak_kib=256)
+def register_user(payload: UserCreate) -> UserRead:
+    """Register a new user.
+
+    The email is claimed in the global directory first, so it stays unique
+    across shards; the claim is released if the user cannot be created.
+    """
+
+    partner_id = 1
+    shard_router = get_shard_router()
+    with shard_router.session_for_shard(DEFAULT_SHARD) as directory:
+        if not claim_emails(directory, {payload.email: partner_id}):
+            raise HTTPException(status_code=400, detail="Email already registered")
+        directory.commit()
+
+    try:
+        with shard_router.session_for_partner(partner_id) as db:
+            user = User(
+                email=payload.email,
+                full_name=payload.full_name,
+                hashed_password=get_password_hash(payload.password),
+                partner_id=partner_id,
+            )
+            db.add(user)
+            db.commit()
+            db.refresh(user)
+            return UserRead(id=user.id, email=user.email, full_name=user.full_name)
+    except IntegrityError as exc:
+        _release_email(payload.email)
+        raise HTTPException(status_code=400, detail="Email already registered") from exc
+    except BaseException:
+        _release_email(payload.email)
+        raise
 
 
 @router.post("/login", response_model=Token)
-def login_user(
-    form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db),
-) -> Token:
+@route_budget(queries=2, peak_kib=256)
+def login_user(form_data: OAuth2PasswordRequestForm = Depends()) -> Token:
     """Authenticate and return access token."""
 
-    user = db.scalar(select(User).where(User.email == form_data.username))
+    user = _find_user(form_data.username)
     if user is None or not verify_password(form_data.password, user.hashed_password):
         raise HTTPException(status_code=400, detail="Incorrect email or password")
 
-    access_token = create_access_token(subject=user.email)
+    access_token = create_access_token(subject=user.email, partner_id=user.partner_id)
     return Token(access_token=access_token)
 
 
 @router.get("/me", response_model=UserProfile)
-def get_current_profile(current_user: User = Depends(get_current_user)) -> UserProfile:
+@route_budget(queries=4, peak_kib=256)
+def get_current_profile(
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+    outlet_id: int | None = Depends(get_current_outlet_id),
+) -> UserProfile:
     """Return current user profile."""
 
     partner = current_user.partner
-    outlet = partner.outlets[0] if partner and partner.outlets else None
+    outlet = db.get(Outlet, outlet_id) if outlet_id is not None else None
     partner_info = PartnerInfo(id=partner.id, name=partner.name) if partner else None
     outlet_info = (
         OutletInfo(
@@ -75,3 +99,23 @@ def get_current_profile(current_user: User = Depends(get_current_user)) -> UserP
         partner=partner_info,
         outlet=outlet_info,
     )
+
+
+def _find_user(email: str) -> User | None:
+    """Look a user up on the shard of the partner the directory names."""
+
+    shard_router = get_shard_router()
+    with shard_router.session_for_shard(DEFAULT_SHARD) as directory:
+        partner_id = partner_for_email(directory, email)
+    if partner_id is None:
+        return None
+    with shard_router.session_for_partner(partner_id) as db:
+        return db.scalar(select(User).where(User.email == email))
+
+
+def _release_email(email: str) -> None:
+    """Drop a directory claim made for a user that was not created."""
+
+    with get_shard_router().session_for_shard(DEFAULT_SHARD) as directory:
+        release_emails(directory, [email])
+        directory.commit()
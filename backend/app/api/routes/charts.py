@@ -2,27 +2,101 @@
 
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends
+from datetime import date
+
+import numpy as np
+from fastapi import APIRouter, Depends, Request, Response
 from sqlalchemy import desc, select
 from sqlalchemy.orm import Session
 
-from app.api.deps import get_current_user, get_db
+from app.api.budgets import route_budget
+from app.api.deps import get_current_outlet_id, get_db
+from app.core.response_cache import cached_json_response
 from app.models.kpi import KpiDaily
 from app.schemas.dashboard import WeeklyChartPoint
+from app.services.kpi_store import get_kpi_store
 
 router = APIRouter()
 
 
 @router.get("/weekly", response_model=list[WeeklyChartPoint])
+@route_budget(queries=3, peak_kib=256)
 def get_weekly_chart(
+    request: Request,
     db: Session = Depends(get_db),
-    current_user=Depends(get_current_user),
-) -> list[WeeklyChartPoint]:
+    outlet_id: int | None = Depends(get_current_outlet_id),
+) -> Response:
     """Return weekly revenue and checks data."""
 
-    rows = db.scalars(select(KpiDaily).order_by(desc(KpiDaily.day)).limit(7)).all()
-    rows = list(reversed(rows))
+    return cached_json_response(
+        request, ("charts.weekly", outlet_id), lambda: _weekly_points(db, outlet_id)
+    )
+
+
+@router.get("/range", response_model=list[WeeklyChartPoint])
+@route_budget(queries=3, peak_kib=512)
+def get_range_chart(
+    date_from: date,
+    date_to: date,
+    db: Session = Depends(get_db),
+    outlet_id: int | None = Depends(get_current_outlet_id),
+) -> list[WeeklyChartPoint]:
+    """Return daily revenue and checks data for a date range."""
+
+    if outlet_id is None:
+        return []
+
+    store = get_kpi_store()
+    if store is not None:
+        return _points(store.get(db, outlet_id).between(date_from, date_to))
+
+    rows = db.execute(
+        select(KpiDaily.day, KpiDaily.revenue, KpiDaily.checks)
+        .where(
+            KpiDaily.outlet_id == outlet_id,
+            KpiDaily.day >= date_from,
+            KpiDaily.day <= date_to,
+        )
+        .order_by(KpiDaily.day)
+    ).all()
+    return [
+        WeeklyChartPoint(day=day, revenue=revenue, checks=checks)
+        for day, revenue, checks in rows
+    ]
+
+
+def _weekly_points(db: Session, outlet_id: int | None) -> list[WeeklyChartPoint]:
+    """Build the outlet's last seven chart points."""
+
+    if outlet_id is None:
+        return []
+
+    store = get_kpi_store()
+    if store is not None:
+        return _points(store.get(db, outlet_id).tail(7))
+
+    rows = db.execute(
+        select(KpiDaily.day, KpiDaily.revenue, KpiDaily.checks)
+        .where(KpiDaily.outlet_id == outlet_id)
+        .order_by(desc(KpiDaily.day))
+        .limit(7)
+    ).all()
+    return [
+        WeeklyChartPoint(day=day, revenue=revenue, checks=checks)
+        for day, revenue, checks in reversed(rows)
+    ]
+
+
+def _points(columns: dict[str, np.ndarray]) -> list[WeeklyChartPoint]:
+    """Convert store column slices into chart points."""
+
     return [
-        WeeklyChartPoint(day=row.day, revenue=row.revenue, checks=row.checks)
-        for row in rows
+        WeeklyChartPoint(
+            day=date.fromordinal(int(ordinal)),
+            revenue=float(revenue),
+            checks=int(checks),
+        )
+        for ordinal, revenue, checks in zip(
+            columns["day"], columns["revenue"], columns["checks"]
+        )
     ]
@@ -2,26 +2,64 @@
 
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query, Request, Response
 from sqlalchemy import desc, select
 from sqlalchemy.orm import Session
 
-from app.api.deps import get_current_user, get_db
+from app.api.budgets import route_budget
+from app.api.deps import get_current_outlet_id, get_db
+from app.core.response_cache import cached_json_response
 from app.models.ai_ticket import AiTicket
 from app.models.kpi import KpiDaily
 from app.schemas.dashboard import AiTicketRead, KpiSummary
+from app.services.profit_forecast import get_profit_forecast
 
 router = APIRouter()
 
 
 @router.get("/kpis", response_model=KpiSummary)
+@route_budget(queries=4, peak_kib=256)
 def get_kpis(
+    request: Request,
     db: Session = Depends(get_db),
-    current_user=Depends(get_current_user),
-) -> KpiSummary:
+    outlet_id: int | None = Depends(get_current_outlet_id),
+) -> Response:
     """Return latest KPI summary."""
 
-    kpi = db.scalar(select(KpiDaily).order_by(desc(KpiDaily.day)))
+    return cached_json_response(
+        request, ("dashboard.kpis", outlet_id), lambda: _kpi_summary(db, outlet_id)
+    )
+
+
+@router.get("/ai-tickets", response_model=list[AiTicketRead])
+@route_budget(queries=3, peak_kib=512)
+def get_ai_tickets(
+    request: Request,
+    before_id: int | None = None,
+    limit: int = Query(default=50, ge=1, le=100),
+    db: Session = Depends(get_db),
+    outlet_id: int | None = Depends(get_current_outlet_id),
+) -> Response:
+    """Return a page of the outlet's AI tickets for the dashboard, newest first."""
+
+    return cached_json_response(
+        request,
+        ("dashboard.ai-tickets", outlet_id, before_id, limit),
+        lambda: _ai_tickets(db, outlet_id, before_id, limit),
+    )
+
+
+def _kpi_summary(db: Session, outlet_id: int | None) -> KpiSummary:
+    """Build the KPI summary of the outlet's latest day."""
+
+    kpi = None
+    if outlet_id is not None:
+        kpi = db.scalar(
+            select(KpiDaily)
+            .where(KpiDaily.outlet_id == outlet_id)
+            .order_by(desc(KpiDaily.day))
+            .limit(1)
+        )
     if kpi is None:
         return KpiSummary(
             revenue_today=0,
@@ -32,24 +70,31 @@ def get_kpis(
             lfl_percent=0,
         )
 
+    profit_forecast = get_profit_forecast(db, kpi.outlet_id, kpi.day)
     return KpiSummary(
         revenue_today=kpi.revenue,
         revenue_plan_percent=kpi.plan_percent,
         labor_cost_percent=kpi.labor_cost_percent,
         food_cost_percent=kpi.food_cost_percent,
-        profit_forecast=kpi.profit_forecast,
+        profit_forecast=(
+            profit_forecast if profit_forecast is not None else kpi.profit_forecast
+        ),
         lfl_percent=kpi.lfl_percent,
     )
 
 
-@router.get("/ai-tickets", response_model=list[AiTicketRead])
-def get_ai_tickets(
-    db: Session = Depends(get_db),
-    current_user=Depends(get_current_user),
+def _ai_tickets(
+    db: Session, outlet_id: int | None, before_id: int | None, limit: int
 ) -> list[AiTicketRead]:
-    """Return AI tickets for the dashboard."""
+    """Build a page of the outlet's AI tickets, newest first."""
+
+    if outlet_id is None:
+        return []
 
-    tickets = db.scalars(select(AiTicket).order_by(desc(AiTicket.id))).all()
+    stmt = select(AiTicket).where(AiTicket.outlet_id == outlet_id)
+    if before_id is not None:
+        stmt = stmt.where(AiTicket.id < before_id)
+    tickets = db.scalars(stmt.order_by(desc(AiTicket.id)).limit(limit)).all()
     return [
         AiTicketRead(
             id=ticket.id,
@@ -2,26 +2,39 @@
 
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends
-from sqlalchemy import select
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import desc, select
 from sqlalchemy.orm import Session
 
-from app.api.deps import get_current_user, get_db
+from app.api.budgets import route_budget
+from app.api.deps import get_current_outlet_id, get_db, require_admin_key
 from app.models.franchise_debt import FranchiseDebt
-from app.schemas.franchise import FranchiseSummary
+from app.models.franchise_ledger import FranchiseBalance, FranchiseLedgerEntry
+from app.schemas.franchise import (
+    FranchiseLedgerEntryCreate,
+    FranchiseLedgerEntryRead,
+    FranchiseSummary,
+)
+from app.services.franchise_ledger import post_entry
 
 router = APIRouter()
 
 
 @router.get("/summary", response_model=FranchiseSummary)
+@route_budget(queries=4, peak_kib=256)
 def get_franchise_summary(
     db: Session = Depends(get_db),
-    current_user=Depends(get_current_user),
+    outlet_id: int | None = Depends(get_current_outlet_id),
 ) -> FranchiseSummary:
     """Return financial summary for franchise obligations."""
 
-    debt = db.scalar(select(FranchiseDebt))
-    if debt is None:
+    balance = debt = None
+    if outlet_id is not None:
+        balance = db.get(FranchiseBalance, outlet_id)
+        debt = db.scalar(
+            select(FranchiseDebt).where(FranchiseDebt.outlet_id == outlet_id)
+        )
+    if balance is None and debt is None:
         return FranchiseSummary(
             royalty_due=0,
             marketing_due=0,
@@ -29,9 +42,83 @@ def get_franchise_summary(
             qsc_index=0,
         )
 
+    dues = balance if balance is not None else debt
     return FranchiseSummary(
-        royalty_due=debt.royalty_due,
-        marketing_due=debt.marketing_due,
-        supplies_due=debt.supplies_due,
-        qsc_index=debt.qsc_index,
+        royalty_due=dues.royalty_due,
+        marketing_due=dues.marketing_due,
+        supplies_due=dues.supplies_due,
+        qsc_index=debt.qsc_index if debt is not None else 0,
+    )
+
+
+@router.get("/ledger", response_model=list[FranchiseLedgerEntryRead])
+@route_budget(queries=3, peak_kib=512)
+def get_franchise_ledger(
+    before_id: int | None = None,
+    limit: int = Query(default=50, ge=1, le=500),
+    db: Session = Depends(get_db),
+    outlet_id: int | None = Depends(get_current_outlet_id),
+) -> list[FranchiseLedgerEntryRead]:
+    """Return ledger history for the outlet, newest first."""
+
+    if outlet_id is None:
+        return []
+
+    stmt = select(FranchiseLedgerEntry).where(
+        FranchiseLedgerEntry.outlet_id == outlet_id
+    )
+    if before_id is not None:
+        stmt = stmt.where(FranchiseLedgerEntry.id < before_id)
+    entries = db.scalars(stmt.order_by(desc(FranchiseLedgerEntry.id)).limit(limit))
+    return [
+        FranchiseLedgerEntryRead(
+            id=entry.id,
+            category=entry.category,
+            kind=entry.kind,
+            amount=entry.amount,
+            posted_on=entry.posted_on,
+            note=entry.note,
+        )
+        for entry in entries
+    ]
+
+
+@router.post(
+    "/ledger",
+    response_model=FranchiseLedgerEntryRead,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(require_admin_key)],
+)
+@route_budget(queries=7, peak_kib=512)
+def create_franchise_ledger_entry(
+    payload: FranchiseLedgerEntryCreate,
+    db: Session = Depends(get_db),
+    outlet_id: int | None = Depends(get_current_outlet_id),
+) -> FranchiseLedgerEntryRead:
+    """Post an accrual or payment for the token's outlet.
+
+    Postings move the outlet's debt, so partners may only read the ledger;
+    writes also require the back-office admin key.
+    """
+
+    if outlet_id is None:
+        raise HTTPException(status_code=404, detail="Outlet not found")
+
+    entry = post_entry(
+        db,
+        outlet_id,
+        payload.category,
+        payload.kind,
+        payload.amount,
+        posted_on=payload.posted_on,
+        note=payload.note,
+    )
+    db.commit()
+    return FranchiseLedgerEntryRead(
+        id=entry.id,
+        category=entry.category,
+        kind=entry.kind,
+        amount=entry.amount,
+        posted_on=entry.posted_on,
+        note=entry.note,
     )
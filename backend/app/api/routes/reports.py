@@ -0,0 +1,160 @@
+"""Report export endpoints."""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Sequence
+from datetime import date, datetime, time, timedelta
+from functools import partial
+from typing import Any
+
+from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Select, select
+
+from app.api.budgets import route_budget
+from app.api.deps import get_current_user
+from app.db.shards import get_shard_router
+from app.models.ai_ticket import AiTicket
+from app.models.kpi import KpiDaily
+from app.models.outlet import Outlet
+from app.models.user import User
+from app.schemas.reports import ExportFormat
+from app.services.exports import iter_csv, iter_xlsx, stream_rows
+
+router = APIRouter()
+
+_MEDIA_TYPES = {
+    ExportFormat.csv: "text/csv; charset=utf-8",
+    ExportFormat.xlsx: (
+        "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    ),
+}
+
+
+@router.get("/kpis")
+@route_budget(queries=2, peak_kib=4096)
+def export_kpis(
+    format: ExportFormat = ExportFormat.csv,
+    date_from: date | None = None,
+    date_to: date | None = None,
+    outlet_id: int | None = None,
+    current_user: User = Depends(get_current_user),
+) -> StreamingResponse:
+    """Stream daily KPIs for the partner's outlets as a file."""
+
+    stmt = (
+        select(
+            KpiDaily.day,
+            Outlet.external_id,
+            Outlet.name,
+            KpiDaily.revenue,
+            KpiDaily.plan_percent,
+            KpiDaily.checks,
+            KpiDaily.labor_cost_percent,
+            KpiDaily.food_cost_percent,
+            KpiDaily.profit_forecast,
+            KpiDaily.lfl_percent,
+        )
+        .join(Outlet, Outlet.id == KpiDaily.outlet_id)
+        .where(Outlet.partner_id == current_user.partner_id)
+        .order_by(KpiDaily.day, KpiDaily.outlet_id)
+    )
+    if date_from is not None:
+        stmt = stmt.where(KpiDaily.day >= date_from)
+    if date_to is not None:
+        stmt = stmt.where(KpiDaily.day <= date_to)
+    if outlet_id is not None:
+        stmt = stmt.where(KpiDaily.outlet_id == outlet_id)
+
+    header = (
+        "day",
+        "outlet_external_id",
+        "outlet_name",
+        "revenue",
+        "plan_percent",
+        "checks",
+        "labor_cost_percent",
+        "food_cost_percent",
+        "profit_forecast",
+        "lfl_percent",
+    )
+    return _export_response("kpis", format, header, stmt, current_user)
+
+
+@router.get("/ai-tickets")
+@route_budget(queries=2, peak_kib=4096)
+def export_ai_tickets(
+    format: ExportFormat = ExportFormat.csv,
+    date_from: date | None = None,
+    date_to: date | None = None,
+    outlet_id: int | None = None,
+    current_user: User = Depends(get_current_user),
+) -> StreamingResponse:
+    """Stream AI tickets for the partner's outlets as a file.
+
+    The date range applies to the day each ticket was created.
+    """
+
+    stmt = (
+        select(
+            AiTicket.id,
+            AiTicket.created_at,
+            Outlet.external_id,
+            Outlet.name,
+            AiTicket.severity,
+            AiTicket.status,
+            AiTicket.title,
+            AiTicket.body,
+            AiTicket.action_label,
+        )
+        .join(Outlet, Outlet.id == AiTicket.outlet_id)
+        .where(Outlet.partner_id == current_user.partner_id)
+        .order_by(AiTicket.id)
+    )
+    if date_from is not None:
+        stmt = stmt.where(AiTicket.created_at >= datetime.combine(date_from, time.min))
+    if date_to is not None:
+        day_after = datetime.combine(date_to + timedelta(days=1), time.min)
+        stmt = stmt.where(AiTicket.created_at < day_after)
+    if outlet_id is not None:
+        stmt = stmt.where(AiTicket.outlet_id == outlet_id)
+
+    header = (
+        "id",
+        "created_at",
+        "outlet_external_id",
+        "outlet_name",
+        "severity",
+        "status",
+        "title",
+        "body",
+        "action_label",
+    )
+    return _export_response("ai-tickets", format, header, stmt, current_user)
+
+
+def _export_response(
+    name: str,
+    format: ExportFormat,
+    header: Sequence[str],
+    stmt: Select,
+    user: User,
+) -> StreamingResponse:
+    """Build a streaming file response for a row-producing statement."""
+
+    shard_router = get_shard_router()
+    shard = shard_router.shard_for_partner(user.partner_id)
+    rows: Iterable[Sequence[Any]] = stream_rows(
+        partial(shard_router.session_for_shard, shard), stmt
+    )
+    if format is ExportFormat.xlsx:
+        body = iter_xlsx(name, header, rows)
+    else:
+        body = iter_csv(header, rows)
+    return StreamingResponse(
+        body,
+        media_type=_MEDIA_TYPES[format],
+        headers={
+            "Content-Disposition": f'attachment; filename="{name}.{format.value}"'
+        },
+    )
@@ -0,0 +1,52 @@
+"""Search endpoints."""
+
+from __future__ import annotations
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+
+from app.api.budgets import route_budget
+from app.api.deps import get_current_user, get_db
+from app.models.user import User
+from app.schemas.search import TicketSearchHit, TicketSearchPage
+from app.services.ticket_search import SearchCursor, search_tickets
+
+router = APIRouter()
+
+
+@router.get("/tickets", response_model=TicketSearchPage)
+@route_budget(queries=4, peak_kib=1024)
+def search_ai_tickets(
+    q: str = Query(min_length=1, max_length=200),
+    limit: int = Query(default=20, ge=1, le=100),
+    cursor: str | None = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> TicketSearchPage:
+    """Search AI tickets of the partner's outlets, most relevant first."""
+
+    try:
+        position = SearchCursor.decode(cursor) if cursor is not None else None
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+        ) from exc
+
+    page = search_tickets(db, current_user.partner_id, q, limit, position)
+    return TicketSearchPage(
+        items=[
+            TicketSearchHit(
+                id=hit.ticket.id,
+                outlet_id=hit.ticket.outlet_id,
+                severity=hit.ticket.severity,
+                status=hit.ticket.status,
+                title=hit.ticket.title,
+                body=hit.ticket.body,
+                action_label=hit.ticket.action_label,
+                rank=hit.rank,
+            )
+            for hit in page.hits
+        ],
+        mode=page.mode,
+        next_cursor=page.next_cursor.encode() if page.next_cursor else None,
+    )
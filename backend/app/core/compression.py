@@ -0,0 +1,126 @@
+"""HTTP response compression negotiated via Accept-Encoding."""
+
+from __future__ import annotations
+
+import gzip
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is optional
+    brotli = None
+
+_COMPRESSIBLE_TYPES = ("application/json", "text/")
+
+# (payload size upper bound, gzip level, brotli quality): larger payloads get
+# cheaper settings so compression CPU stays roughly proportional to size.
+_LEVELS = (
+    (64 * 1024, 6, 5),
+    (1024 * 1024, 4, 4),
+)
+_LARGE_PAYLOAD_LEVELS = (1, 1)
+
+
+def supported_encodings() -> tuple[str, ...]:
+    """Return encodings this process can produce, most preferred first."""
+
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def negotiate_encoding(accept_encoding: str | None) -> str | None:
+    """Pick the best supported encoding accepted by the client."""
+
+    if not accept_encoding:
+        return None
+    accepted: dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+
+    wildcard = accepted.get("*", 0.0)
+    for encoding in supported_encodings():
+        if accepted.get(encoding, wildcard) > 0:
+            return encoding
+    return None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    """Compress a payload with a level chosen from its size."""
+
+    gzip_level, brotli_quality = _levels_for(len(body))
+    if encoding == "br":
+        return brotli.compress(body, quality=brotli_quality)
+    return gzip.compress(body, compresslevel=gzip_level, mtime=0)
+
+
+def _levels_for(size: int) -> tuple[int, int]:
+    """Return gzip level and brotli quality for a payload size."""
+
+    for limit, gzip_level, brotli_quality in _LEVELS:
+        if size <= limit:
+            return gzip_level, brotli_quality
+    return _LARGE_PAYLOAD_LEVELS
+
+
+class CompressionMiddleware:
+    """Compress complete responses above a size threshold.
+
+    Streaming responses and responses that already carry a
+    ``Content-Encoding`` (for example precompressed cache hits) pass through.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Message | None = None
+        passthrough = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start, passthrough
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            headers = MutableHeaders(raw=start["headers"])
+            if (
+                message.get("more_body", False)
+                or "content-encoding" in headers
+                or len(body) < self.minimum_size
+                or not headers.get("content-type", "").startswith(_COMPRESSIBLE_TYPES)
+            ):
+                passthrough = True
+                await send(start)
+                await send(message)
+                return
+
+            payload = compress(body, encoding)
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(payload))
+            headers.add_vary_header("Accept-Encoding")
+            await send(start)
+            await send({"type": "http.response.body", "body": payload})
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,107 @@
+"""Per-key JSON response cache holding precompressed variants."""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from functools import lru_cache
+from typing import Any
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.core.compression import compress, negotiate_encoding
+from app.core.config import get_settings
+
+
+class CachedPayload:
+    """Rendered JSON body plus lazily built compressed variants."""
+
+    __slots__ = ("body", "created_at", "_variants", "_lock")
+
+    def __init__(self, body: bytes) -> None:
+        self.body = body
+        self.created_at = time.monotonic()
+        self._variants: dict[str, bytes] = {}
+        self._lock = threading.Lock()
+
+    def encoded(self, encoding: str) -> bytes:
+        """Return the body compressed with ``encoding``, compressing once."""
+
+        with self._lock:
+            payload = self._variants.get(encoding)
+            if payload is None:
+                payload = self._variants[encoding] = compress(self.body, encoding)
+            return payload
+
+
+class ResponseCache:
+    """LRU cache of rendered responses with a time-to-live."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float) -> None:
+        self._entries: OrderedDict[Hashable, CachedPayload] = OrderedDict()
+        self._lock = threading.Lock()
+        self._max_entries = max_entries
+        self._ttl_seconds = ttl_seconds
+
+    def get(self, key: Hashable) -> CachedPayload | None:
+        """Return a fresh entry or None."""
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if time.monotonic() - entry.created_at > self._ttl_seconds:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: Hashable, entry: CachedPayload) -> None:
+        """Store an entry, evicting the least recently used ones."""
+
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+
+@lru_cache
+def get_response_cache() -> ResponseCache:
+    """Return the process-wide response cache."""
+
+    settings = get_settings()
+    return ResponseCache(
+        max_entries=settings.response_cache_max_entries,
+        ttl_seconds=settings.response_cache_ttl_seconds,
+    )
+
+
+def cached_json_response(
+    request: Request, key: Hashable, build: Callable[[], Any]
+) -> Response:
+    """Serve a JSON payload from the cache, compressed for the client.
+
+    On a miss ``build`` produces the payload, which is rendered once; each
+    encoding is compressed at most once per cache entry.
+    """
+
+    cache = get_response_cache()
+    entry = cache.get(key)
+    if entry is None:
+        body = JSONResponse(content=jsonable_encoder(build())).body
+        entry = CachedPayload(body)
+        cache.put(key, entry)
+
+    headers = {"Vary": "Accept-Encoding"}
+    encoding = negotiate_encoding(request.headers.get("accept-encoding"))
+    if encoding is None or len(entry.body) < get_settings().compression_minimum_size:
+        return Response(entry.body, media_type="application/json", headers=headers)
+    headers["Content-Encoding"] = encoding
+    return Response(
+        entry.encoded(encoding), media_type="application/json", headers=headers
+    )
@@ -2,6 +2,10 @@
 
 from __future__ import annotations
 
+import multiprocessing
+import os
+from collections.abc import Sequence
+from concurrent.futures import ProcessPoolExecutor
 from datetime import UTC, datetime, timedelta
 from typing import Any
 
@@ -10,7 +14,11 @@ from passlib.context import CryptContext
 
 from app.core.config import get_settings
 
-_pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+_pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=get_settings().password_bcrypt_rounds,
+)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -27,8 +35,34 @@ def get_password_hash(password: str) -> str:
     return _pwd_context.hash(normalized)
 
 
-def create_access_token(subject: str, expires_delta: timedelta | None = None) -> str:
-    """Create a signed JWT access token for a subject."""
+def hash_passwords(passwords: Sequence[str], workers: int | None = None) -> list[str]:
+    """Hash many passwords in order, spread over a process pool.
+
+    bcrypt is CPU bound, so large batches are split across ``workers``
+    processes (``PASSWORD_HASH_WORKERS``, defaulting to the CPU count).
+    Batches too small to amortize starting the pool are hashed in-process.
+    """
+
+    workers = workers or get_settings().password_hash_workers or os.cpu_count() or 1
+    if workers <= 1 or len(passwords) < 4 * workers:
+        return [get_password_hash(password) for password in passwords]
+    with ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+    ) as pool:
+        chunksize = max(1, len(passwords) // (workers * 8))
+        return list(pool.map(get_password_hash, passwords, chunksize=chunksize))
+
+
+def create_access_token(
+    subject: str,
+    expires_delta: timedelta | None = None,
+    partner_id: int | None = None,
+) -> str:
+    """Create a signed JWT access token for a subject.
+
+    ``partner_id`` is stored in the ``pid`` claim and used to route requests
+    to the partner's database shard.
+    """
 
     settings = get_settings()
     expire = datetime.now(UTC) + (
@@ -37,6 +71,8 @@ def create_access_token(subject: str, expires_delta: timedelta | None = None) ->
         else timedelta(minutes=settings.access_token_expire_minutes)
     )
     payload: dict[str, Any] = {"sub": subject, "exp": expire}
+    if partner_id is not None:
+        payload["pid"] = partner_id
     return jwt.encode(payload, settings.jwt_secret_key, algorithm=settings.jwt_algorithm)
 
 
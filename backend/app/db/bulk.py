@@ -0,0 +1,34 @@
+"""Set-based inserts that skip rows violating a unique key."""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+from typing import Any
+
+from sqlalchemy import Table
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+_DIALECT_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+def insert_ignoring_conflicts(
+    session: Session, table: Table, rows: Sequence[dict[str, Any]], key: str
+) -> list[Any]:
+    """Insert rows, skipping those whose unique ``key`` is already taken.
+
+    Returns the ``key`` values of the rows actually inserted.
+    """
+
+    if not rows:
+        return []
+    dialect = session.get_bind().dialect.name
+    dialect_insert = _DIALECT_INSERTS.get(dialect)
+    if dialect_insert is None:
+        raise ValueError(f"Conflict-skipping inserts do not support {dialect}")
+    stmt = (
+        dialect_insert(table)
+        .on_conflict_do_nothing(index_elements=[table.c[key]])
+        .returning(table.c[key])
+    )
+    return list(session.scalars(stmt, rows))
@@ -4,7 +4,7 @@ from __future__ import annotations
 
 from datetime import date, timedelta
 
-from sqlalchemy import select
+from sqlalchemy import select, update
 from sqlalchemy.orm import Session
 
 from app.core.config import get_settings
@@ -16,6 +16,10 @@ from app.models.kpi import KpiDaily
 from app.models.outlet import Outlet
 from app.models.partner import Partner
 from app.models.user import User
+from app.models.user_directory import UserDirectoryEntry
+from app.services import outbox  # noqa: F401  (records tracked writes in the outbox)
+from app.services.franchise_ledger import open_balances_from_debts
+from app.services.profit_forecast import refresh_profit_forecasts
 
 
 def init_db(session: Session) -> None:
@@ -25,6 +29,7 @@ def init_db(session: Session) -> None:
     settings = get_settings()
     if _has_users(session):
         _ensure_seed_user_email(session, settings.seed_user_email)
+        open_balances_from_debts(session)
         return
     partner = Partner(name=settings.seed_partner_name)
     outlet = Outlet(
@@ -94,6 +99,8 @@ def init_db(session: Session) -> None:
     )
 
     session.commit()
+    open_balances_from_debts(session)
+    refresh_profit_forecasts(session)
 
 
 def _has_users(session: Session) -> bool:
@@ -114,4 +121,9 @@ def _ensure_seed_user_email(session: Session, seed_email: str) -> None:
     if user is None:
         return
     user.email = seed_email
+    session.execute(
+        update(UserDirectoryEntry)
+        .where(UserDirectoryEntry.email == legacy_email)
+        .values(email=seed_email)
+    )
     session.commit()
@@ -0,0 +1,137 @@
+"""Full-text search structures for AI tickets, created per dialect.
+
+PostgreSQL gets a generated ``tsvector`` column with Russian configuration
+and a GIN index, plus a ``pg_trgm`` index for typo-tolerant fallback when
+the extension can be installed. SQLite gets an external-content FTS5 table
+kept in sync by triggers. Other dialects are left without search support.
+"""
+
+from __future__ import annotations
+
+import logging
+
+from sqlalchemy import Connection, Engine, text
+from sqlalchemy.exc import DBAPIError
+
+logger = logging.getLogger("portal.backend")
+
+TS_CONFIG = "russian"
+TRIGRAM_DOCUMENT = "(ai_tickets.title || ' ' || ai_tickets.body)"
+
+# Each statement runs only when its structure is missing: PostgreSQL takes a
+# table lock for ALTER TABLE and CREATE INDEX even with IF NOT EXISTS.
+_SEARCH_VECTOR_DDL = f"""
+    ALTER TABLE ai_tickets ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('{TS_CONFIG}', title), 'A')
+        || setweight(to_tsvector('{TS_CONFIG}', body), 'B')
+    ) STORED
+    """
+_SEARCH_INDEX_DDL = """
+    CREATE INDEX IF NOT EXISTS ix_ai_tickets_search_vector
+    ON ai_tickets USING gin (search_vector)
+    """
+_TRIGRAM_DDL = (
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    f"""
+    CREATE INDEX IF NOT EXISTS ix_ai_tickets_document_trgm
+    ON ai_tickets USING gin ({TRIGRAM_DOCUMENT} gin_trgm_ops)
+    """,
+)
+_SQLITE_DDL = (
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS ai_tickets_fts USING fts5(
+        title, body, content='ai_tickets', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS ai_tickets_fts_insert AFTER INSERT ON ai_tickets
+    BEGIN
+        INSERT INTO ai_tickets_fts (rowid, title, body)
+        VALUES (new.id, new.title, new.body);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS ai_tickets_fts_delete AFTER DELETE ON ai_tickets
+    BEGIN
+        INSERT INTO ai_tickets_fts (ai_tickets_fts, rowid, title, body)
+        VALUES ('delete', old.id, old.title, old.body);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS ai_tickets_fts_update
+    AFTER UPDATE OF title, body ON ai_tickets
+    BEGIN
+        INSERT INTO ai_tickets_fts (ai_tickets_fts, rowid, title, body)
+        VALUES ('delete', old.id, old.title, old.body);
+        INSERT INTO ai_tickets_fts (rowid, title, body)
+        VALUES (new.id, new.title, new.body);
+    END
+    """,
+)
+
+
+def install_ticket_search(engine: Engine) -> None:
+    """Create missing search columns, indexes, tables and triggers."""
+
+    if engine.dialect.name == "postgresql":
+        _install_postgres(engine)
+    elif engine.dialect.name == "sqlite":
+        _install_sqlite(engine)
+
+
+def has_trigram_index(connection: Connection) -> bool:
+    """Return whether the typo-tolerant trigram index exists."""
+
+    return (
+        connection.dialect.name == "postgresql"
+        and connection.scalar(
+            text("SELECT to_regclass('ix_ai_tickets_document_trgm') IS NOT NULL")
+        )
+    )
+
+
+def _install_postgres(engine: Engine) -> None:
+    with engine.begin() as connection:
+        if not _has_search_vector(connection):
+            connection.execute(text(_SEARCH_VECTOR_DDL))
+        if not _has_index(connection, "ix_ai_tickets_search_vector"):
+            connection.execute(text(_SEARCH_INDEX_DDL))
+        if has_trigram_index(connection):
+            return
+    try:
+        with engine.begin() as connection:
+            for statement in _TRIGRAM_DDL:
+                connection.execute(text(statement))
+    except DBAPIError as exc:
+        logger.warning("Trigram search fallback unavailable: %s", exc.orig)
+
+
+def _has_search_vector(connection: Connection) -> bool:
+    return connection.scalar(
+        text(
+            "SELECT EXISTS (SELECT 1 FROM information_schema.columns "
+            "WHERE table_schema = current_schema() AND table_name = 'ai_tickets' "
+            "AND column_name = 'search_vector')"
+        )
+    )
+
+
+def _has_index(connection: Connection, name: str) -> bool:
+    return connection.scalar(
+        text("SELECT to_regclass(:name) IS NOT NULL"), {"name": name}
+    )
+
+
+def _install_sqlite(engine: Engine) -> None:
+    with engine.begin() as connection:
+        existed = connection.scalar(
+            text("SELECT 1 FROM sqlite_master WHERE name = 'ai_tickets_fts'")
+        )
+        for statement in _SQLITE_DDL:
+            connection.execute(text(statement))
+        if not existed:
+            connection.execute(
+                text("INSERT INTO ai_tickets_fts (ai_tickets_fts) VALUES ('rebuild')")
+            )
@@ -8,11 +8,11 @@ from sqlalchemy.orm import sessionmaker
 from app.core.config import get_settings
 
 
-def get_engine():
-    """Create SQLAlchemy engine from settings."""
+def get_engine(database_url: str | None = None):
+    """Create SQLAlchemy engine from settings or an explicit shard URL."""
 
     settings = get_settings()
-    return create_engine(settings.database_url, pool_pre_ping=True)
+    return create_engine(database_url or settings.database_url, pool_pre_ping=True)
 
 
 ENGINE = get_engine()
@@ -0,0 +1,296 @@
+"""Online migration of a partner's rows between shards.
+
+Usage::
+
+    python -m app.db.shard_migration PARTNER_ID TARGET_SHARD
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import time
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+
+from sqlalchemy import Connection, Table, and_, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.core.config import get_settings
+from app.db.shards import ShardRouter, get_shard_router
+from app.models.base import Base
+
+logger = logging.getLogger("portal.backend")
+
+# Routing and directory rows live in the default database and never move.
+_SHARD_LOCAL_TABLES = {"partner_shards", "partner_moves", "user_directory"}
+# Only undelivered outbox events move; delivered ones are purged with the rest.
+_OUTBOX_TABLE = "outbox_events"
+
+
+class ShardMigrationError(RuntimeError):
+    """Raised when a partner cannot be moved safely."""
+
+
+@dataclass
+class MoveReport:
+    """Row counts written to the target and purged from the source."""
+
+    source: str
+    target: str
+    inserted: dict[str, int] = field(default_factory=dict)
+    updated: dict[str, int] = field(default_factory=dict)
+    deleted: dict[str, int] = field(default_factory=dict)
+    purged: dict[str, int] = field(default_factory=dict)
+
+
+def move_partner(
+    shard_router: ShardRouter,
+    partner_id: int,
+    target: str,
+    batch_size: int = 1000,
+    settle_seconds: float | None = None,
+) -> MoveReport:
+    """Move every row of a partner to another shard while it stays online.
+
+    1. Copy all partner rows to the target in primary-key batches while the
+       partner keeps working on the source.
+    2. Block the partner's writes, then wait for cached routes to expire and
+       in-flight requests to finish; writes are refused meanwhile.
+    3. Sync the rows changed since step 1, making the target an exact copy.
+    4. Switch the route to the target, which lifts the block, and wait for
+       cached routes to expire again before deleting the source rows.
+
+    Reads keep working throughout. The target serves no request for the
+    partner before step 4, so the syncs may overwrite and delete its partner
+    rows. If anything fails before the switch the block is lifted and the
+    partner stays on the source. Outbox events not yet delivered move with
+    the partner; dispatchers leave them alone while the partner is blocked
+    and deliver them on the target after the switch.
+
+    Rows keep their ids, which is safe because every shard allocates ids from
+    its own range (``ShardRouter.id_range``); only PostgreSQL shards enforce
+    the ranges, so other databases are refused.
+    """
+
+    source = shard_router.shard_for_partner(partner_id)
+    report = MoveReport(source=source, target=target)
+    if source == target:
+        return report
+    for shard in (source, target):
+        dialect = shard_router.engine(shard).dialect.name
+        if dialect != "postgresql":
+            raise ShardMigrationError(
+                f"Shard {shard} uses {dialect}; moving partners needs PostgreSQL"
+            )
+    if settle_seconds is None:
+        settle_seconds = get_settings().shard_route_ttl_seconds + 5
+
+    tables = _tenant_tables()
+
+    logger.info("Copying partner %s from %s to %s", partner_id, source, target)
+    _sync_partner(
+        shard_router, partner_id, source, target, tables, batch_size, report
+    )
+
+    shard_router.block_writes(partner_id, target)
+    try:
+        time.sleep(settle_seconds)
+        logger.info("Syncing writes made during the copy for partner %s", partner_id)
+        _sync_partner(
+            shard_router, partner_id, source, target, tables, batch_size, report
+        )
+        shard_router.align_id_sequences(target)
+        shard_router.assign(partner_id, target)
+    except BaseException:
+        shard_router.unblock_writes(partner_id)
+        raise
+
+    time.sleep(settle_seconds)
+    with shard_router.engine(source).begin() as connection:
+        outlet_ids = _outlet_ids(connection, partner_id)
+        for table in reversed(tables):
+            condition = _partner_condition(table, partner_id, outlet_ids)
+            removed = connection.execute(table.delete().where(condition)).rowcount
+            report.purged[table.name] = removed
+    logger.info("Partner %s moved to %s", partner_id, target)
+    return report
+
+
+def _tenant_tables() -> list[Table]:
+    """Return tables holding per-partner rows in foreign-key order."""
+
+    return [
+        table
+        for table in Base.metadata.sorted_tables
+        if table.name not in _SHARD_LOCAL_TABLES
+        and (
+            table.name == "partners"
+            or "partner_id" in table.c
+            or "outlet_id" in table.c
+        )
+    ]
+
+
+def _outlet_ids(connection: Connection, partner_id: int) -> list[int]:
+    """Return the ids of a partner's outlets."""
+
+    outlets = Base.metadata.tables["outlets"]
+    return list(
+        connection.scalars(
+            select(outlets.c.id).where(outlets.c.partner_id == partner_id)
+        )
+    )
+
+
+def _partner_condition(
+    table: Table, partner_id: int, outlet_ids: Sequence[int]
+) -> ColumnElement[bool]:
+    """Return the filter selecting a partner's rows in a table."""
+
+    if table.name == "partners":
+        return table.c.id == partner_id
+    if "partner_id" in table.c:
+        return table.c.partner_id == partner_id
+    return table.c.outlet_id.in_(outlet_ids)
+
+
+def _sync_partner(
+    shard_router: ShardRouter,
+    partner_id: int,
+    source: str,
+    target: str,
+    tables: list[Table],
+    batch_size: int,
+    report: MoveReport,
+) -> None:
+    """Make the target's partner rows equal to the source's in one transaction.
+
+    Inserts and updates run parents first; rows gone from the source are
+    deleted children first so foreign keys hold throughout.
+    """
+
+    with shard_router.engine(source).connect() as source_conn:
+        outlet_ids = _outlet_ids(source_conn, partner_id)
+        try:
+            with shard_router.engine(target).begin() as target_conn:
+                stale_keys: list[tuple[Table, set]] = []
+                for table in tables:
+                    condition = _partner_condition(table, partner_id, outlet_ids)
+                    if table.name == _OUTBOX_TABLE:
+                        condition = and_(condition, table.c.dispatched_at.is_(None))
+                    inserted, updated, stale = _sync_table(
+                        table, condition, source_conn, target_conn, batch_size
+                    )
+                    _count(report.inserted, table, inserted)
+                    _count(report.updated, table, updated)
+                    stale_keys.append((table, stale))
+                for table, stale in reversed(stale_keys):
+                    key = _primary_key(table)
+                    for chunk in _chunks(sorted(stale), batch_size):
+                        target_conn.execute(table.delete().where(key.in_(chunk)))
+                    _count(report.deleted, table, len(stale))
+        except IntegrityError as exc:
+            raise ShardMigrationError(
+                f"Partner {partner_id} rows conflict with existing rows on {target}"
+            ) from exc
+
+
+def _sync_table(
+    table: Table,
+    condition: ColumnElement[bool],
+    source_conn: Connection,
+    target_conn: Connection,
+    batch_size: int,
+) -> tuple[int, int, set]:
+    """Merge source rows into the target in primary-key ranges.
+
+    Returns the inserted and updated counts and the keys of target rows that
+    no longer exist on the source.
+    """
+
+    key = _primary_key(table)
+    inserted = updated = 0
+    stale: set = set()
+    last = None
+    while True:
+        stmt = select(table).where(condition).order_by(key).limit(batch_size)
+        if last is not None:
+            stmt = stmt.where(key > last)
+        rows = [dict(row) for row in source_conn.execute(stmt).mappings()]
+        upper = rows[-1][key.name] if rows else None
+
+        bounds = [condition]
+        if last is not None:
+            bounds.append(key > last)
+        if upper is not None:
+            bounds.append(key <= upper)
+        existing = {
+            row[key.name]: dict(row)
+            for row in target_conn.execute(select(table).where(and_(*bounds)))
+            .mappings()
+        }
+
+        fresh = [row for row in rows if row[key.name] not in existing]
+        changed = [
+            row
+            for row in rows
+            if row[key.name] in existing and existing[row[key.name]] != row
+        ]
+        if fresh:
+            target_conn.execute(table.insert(), fresh)
+        for row in changed:
+            target_conn.execute(table.update().where(key == row[key.name]).values(row))
+        stale.update(set(existing) - {row[key.name] for row in rows})
+        inserted += len(fresh)
+        updated += len(changed)
+
+        if upper is None:
+            return inserted, updated, stale
+        last = upper
+
+
+def _count(counts: dict[str, int], table: Table, value: int) -> None:
+    """Add a per-table row count to a report section."""
+
+    counts[table.name] = counts.get(table.name, 0) + value
+
+
+def _chunks(values: list, size: int) -> list[list]:
+    """Split a list into consecutive chunks of at most ``size`` items."""
+
+    return [values[index : index + size] for index in range(0, len(values), size)]
+
+
+def _primary_key(table: Table):
+    """Return the single primary-key column of a table."""
+
+    columns = list(table.primary_key.columns)
+    if len(columns) != 1:
+        raise ShardMigrationError(f"{table.name} needs a single-column primary key")
+    return columns[0]
+
+
+def main() -> None:
+    """Move a partner to another shard from the command line."""
+
+    parser = argparse.ArgumentParser(description="Move a partner between shards.")
+    parser.add_argument("partner_id", type=int)
+    parser.add_argument("target")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    import app.db.init_db  # noqa: F401  (registers every mapped model)
+
+    logging.basicConfig(level=logging.INFO)
+    shard_router = get_shard_router()
+    shard_router.create_all()
+    report = move_partner(
+        shard_router, args.partner_id, args.target, batch_size=args.batch_size
+    )
+    logger.info("Report: %s", report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,345 @@
+"""Partner-based database sharding."""
+
+from __future__ import annotations
+
+import time
+from functools import lru_cache
+from typing import Any
+
+from sqlalchemy import Connection, Engine, Table, event, exists, func, select, text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import ORMExecuteState, Session, sessionmaker
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.core.config import get_settings
+from app.db.search import install_ticket_search
+from app.db.session import ENGINE, SessionLocal, get_engine
+from app.db.upgrades import upgrade_schema
+from app.models.base import Base
+from app.models.partner_move import PartnerMove
+from app.models.partner_shard import PartnerShard
+from app.models.shard_id_range import ShardIdRange
+
+DEFAULT_SHARD = "default"
+# Ids are 32-bit, which leaves room for the default shard and 20 more.
+SHARD_ID_RANGE = 100_000_000
+_MAX_ID = 2**31 - 1
+
+
+class UnknownShardError(LookupError):
+    """Raised when a shard name is not configured."""
+
+
+class PartnerMovingError(RuntimeError):
+    """Raised when a partner's rows are written while it moves between shards."""
+
+    def __init__(self, partner_id: int) -> None:
+        super().__init__(f"Partner {partner_id} is moving between shards")
+        self.partner_id = partner_id
+
+
+class ShardRouter:
+    """Opens sessions on the shard that holds a partner's rows.
+
+    Shard URLs come from settings; the partner to shard assignment is read
+    from the ``partner_shards`` table of the default database and cached for
+    ``route_ttl_seconds`` per process, together with whether the partner is
+    being moved (``partner_moves``), which makes its sessions read-only.
+    """
+
+    def __init__(
+        self,
+        shard_urls: dict[str, str],
+        default_engine: Engine,
+        default_sessionmaker: sessionmaker,
+        route_ttl_seconds: float,
+    ) -> None:
+        self._urls = shard_urls
+        self._engines: dict[str, Engine] = {DEFAULT_SHARD: default_engine}
+        self._sessionmakers: dict[str, sessionmaker] = {
+            DEFAULT_SHARD: default_sessionmaker
+        }
+        self._routes: dict[int, tuple[str, bool, float]] = {}
+        self._id_ranges: dict[str, int] = {DEFAULT_SHARD: 0}
+        self._route_ttl_seconds = route_ttl_seconds
+
+    def shard_names(self) -> list[str]:
+        """Return all configured shard names, default first."""
+
+        return [DEFAULT_SHARD, *(name for name in self._urls if name != DEFAULT_SHARD)]
+
+    def engine(self, shard: str) -> Engine:
+        """Return the engine of a shard, creating it on first use."""
+
+        engine = self._engines.get(shard)
+        if engine is None:
+            url = self._urls.get(shard)
+            if url is None:
+                raise UnknownShardError(shard)
+            engine = self._engines[shard] = get_engine(url)
+        return engine
+
+    def session_for_shard(self, shard: str) -> Session:
+        """Open a session on a named shard."""
+
+        factory = self._sessionmakers.get(shard)
+        if factory is None:
+            factory = self._sessionmakers[shard] = sessionmaker(
+                autocommit=False, autoflush=False, bind=self.engine(shard)
+            )
+        return factory()
+
+    def shard_for_partner(self, partner_id: int | None) -> str:
+        """Return the shard holding a partner, using the cached route."""
+
+        return self._route(partner_id)[0]
+
+    def session_for_partner(self, partner_id: int | None) -> Session:
+        """Open a session on the shard holding a partner.
+
+        While the partner is being moved the session raises
+        ``PartnerMovingError`` instead of writing.
+        """
+
+        shard, moving = self._route(partner_id)
+        session = self.session_for_shard(shard)
+        if moving:
+            _refuse_writes(session, partner_id)
+        return session
+
+    def block_writes(self, partner_id: int, target: str) -> None:
+        """Make the partner's sessions read-only until ``assign`` or unblock."""
+
+        with self.session_for_shard(DEFAULT_SHARD) as session:
+            session.merge(PartnerMove(partner_id=partner_id, target_shard=target))
+            session.commit()
+        self._routes.pop(partner_id, None)
+
+    def unblock_writes(self, partner_id: int) -> None:
+        """Let the partner write again on its current shard."""
+
+        with self.session_for_shard(DEFAULT_SHARD) as session:
+            move = session.get(PartnerMove, partner_id)
+            if move is not None:
+                session.delete(move)
+                session.commit()
+        self._routes.pop(partner_id, None)
+
+    def assign(self, partner_id: int, shard: str) -> None:
+        """Route a partner to a shard from now on, lifting any write block."""
+
+        self.engine(shard)
+        with self.session_for_shard(DEFAULT_SHARD) as session:
+            route = session.get(PartnerShard, partner_id)
+            if shard == DEFAULT_SHARD:
+                if route is not None:
+                    session.delete(route)
+            elif route is None:
+                session.add(PartnerShard(partner_id=partner_id, shard_name=shard))
+            else:
+                route.shard_name = shard
+            move = session.get(PartnerMove, partner_id)
+            if move is not None:
+                session.delete(move)
+            session.commit()
+        self._routes.pop(partner_id, None)
+
+    def owned_partners(self, shard: str, column: Any) -> ColumnElement[bool]:
+        """Return a filter on a partner id ``column`` for background writers.
+
+        It keeps partners whose rows ``shard`` owns and that are not being
+        moved, read fresh from the routing tables. Workers that open sessions
+        with ``session_for_shard`` use it to respect a move's write block and
+        to leave rows copied to, or not yet purged from, another shard alone.
+        """
+
+        with self.session_for_shard(DEFAULT_SHARD) as session:
+            routes = dict(
+                session.execute(
+                    select(PartnerShard.partner_id, PartnerShard.shard_name)
+                ).all()
+            )
+            moving = set(session.scalars(select(PartnerMove.partner_id)))
+        if shard == DEFAULT_SHARD:
+            return column.not_in([*routes, *moving])
+        return column.in_(
+            [
+                partner_id
+                for partner_id, route in routes.items()
+                if route == shard and partner_id not in moving
+            ]
+        )
+
+    def _reserve_id_range(self, shard: str) -> int:
+        """Return the start of a shard's id range, reserving it if needed."""
+
+        self.engine(shard)
+        for _ in range(3):
+            with self.session_for_shard(DEFAULT_SHARD) as session:
+                start = session.scalar(
+                    select(ShardIdRange.range_start).where(
+                        ShardIdRange.shard_name == shard
+                    )
+                )
+                if start is not None:
+                    return start
+                taken = session.scalar(select(func.max(ShardIdRange.range_start)))
+                start = (taken or 0) + SHARD_ID_RANGE
+                if start + SHARD_ID_RANGE > _MAX_ID:
+                    raise RuntimeError(f"No id range left for shard {shard}")
+                session.add(ShardIdRange(shard_name=shard, range_start=start))
+                try:
+                    session.commit()
+                except IntegrityError:
+                    continue
+                return start
+        raise RuntimeError(f"Could not reserve an id range for shard {shard}")
+
+    def _route(self, partner_id: int | None) -> tuple[str, bool]:
+        """Return a partner's shard and whether it is moving, cached."""
+
+        if partner_id is None:
+            return DEFAULT_SHARD, False
+        cached = self._routes.get(partner_id)
+        if cached is not None and cached[2] > time.monotonic():
+            return cached[0], cached[1]
+
+        with self.session_for_shard(DEFAULT_SHARD) as session:
+            shard, moving = session.execute(
+                select(
+                    select(PartnerShard.shard_name)
+                    .where(PartnerShard.partner_id == partner_id)
+                    .scalar_subquery(),
+                    exists().where(PartnerMove.partner_id == partner_id),
+                )
+            ).one()
+        shard = shard or DEFAULT_SHARD
+        self._routes[partner_id] = (
+            shard,
+            moving,
+            time.monotonic() + self._route_ttl_seconds,
+        )
+        return shard, moving
+
+    def create_all(self) -> None:
+        """Create or upgrade tables and search structures on every shard.
+
+        PostgreSQL id sequences are then aligned with each shard's id range.
+        """
+
+        for shard in self.shard_names():
+            Base.metadata.create_all(bind=self.engine(shard))
+            upgrade_schema(self.engine(shard))
+            install_ticket_search(self.engine(shard))
+        for shard in self.shard_names():
+            self.align_id_sequences(shard)
+
+    def id_range(self, shard: str) -> tuple[int, int]:
+        """Return the ids ``(low, high)`` a shard allocates from, exclusive.
+
+        Ranges of other shards are reserved in ``shard_id_ranges`` on first
+        use, one ``SHARD_ID_RANGE`` block after the highest taken.
+        """
+
+        start = self._id_ranges.get(shard)
+        if start is None:
+            start = self._id_ranges[shard] = self._reserve_id_range(shard)
+        return start, start + SHARD_ID_RANGE
+
+    def align_id_sequences(self, shard: str) -> None:
+        """Move PostgreSQL id sequences of a shard past its ids in its range.
+
+        Rows copied in from other shards keep ids outside the range and do
+        not affect the sequences. Sequences only ever move forward, under a
+        table lock, so no id is handed out twice.
+        """
+
+        engine = self.engine(shard)
+        if engine.dialect.name != "postgresql":
+            return
+        low, high = self.id_range(shard)
+        with engine.begin() as connection:
+            for table in Base.metadata.sorted_tables:
+                column = table.autoincrement_column
+                if column is None:
+                    continue
+                sequence = connection.scalar(
+                    text("SELECT pg_get_serial_sequence(:table, :column)"),
+                    {"table": table.name, "column": column.name},
+                )
+                if sequence is None:
+                    continue
+                if _sequence_behind(connection, table, sequence, low, high) is None:
+                    continue
+                connection.execute(text(f"LOCK TABLE {table.name} IN EXCLUSIVE MODE"))
+                floor = _sequence_behind(connection, table, sequence, low, high)
+                if floor is not None:
+                    connection.execute(
+                        text("SELECT setval(:sequence, :value, false)"),
+                        {"sequence": sequence, "value": floor + 1},
+                    )
+
+    def dispose(self, close: bool = True) -> None:
+        """Dispose pooled connections of every opened shard engine."""
+
+        for engine in self._engines.values():
+            engine.dispose(close=close)
+
+
+def _sequence_behind(
+    connection: Connection, table: Table, sequence: str, low: int, high: int
+) -> int | None:
+    """Return the id a sequence must pass if its next value is not in range.
+
+    That is the highest id used in ``(low, high)``, or ``low`` when none is;
+    None means the next value is already past it.
+    """
+
+    column = table.autoincrement_column
+    used = connection.scalar(
+        select(func.max(column)).where(column > low, column < high)
+    )
+    floor = used or low
+    last_value, is_called = connection.execute(
+        text(f"SELECT last_value, is_called FROM {sequence}")
+    ).one()
+    next_value = last_value + 1 if is_called else last_value
+    return floor if next_value <= floor else None
+
+
+def _refuse_writes(session: Session, partner_id: int) -> None:
+    """Make a session raise ``PartnerMovingError`` on flushes and DML."""
+
+    def refuse_flush(*args: Any) -> None:
+        raise PartnerMovingError(partner_id)
+
+    def refuse_dml(state: ORMExecuteState) -> None:
+        if state.is_insert or state.is_update or state.is_delete:
+            raise PartnerMovingError(partner_id)
+
+    event.listen(session, "before_flush", refuse_flush)
+    event.listen(session, "do_orm_execute", refuse_dml)
+
+
+def parse_shard_urls(value: str) -> dict[str, str]:
+    """Parse ``name=url`` pairs separated by semicolons."""
+
+    shards: dict[str, str] = {}
+    for item in value.split(";"):
+        name, separator, url = item.strip().partition("=")
+        if separator and name.strip() and url.strip():
+            shards[name.strip()] = url.strip()
+    return shards
+
+
+@lru_cache
+def get_shard_router() -> ShardRouter:
+    """Return the process-wide shard router."""
+
+    settings = get_settings()
+    return ShardRouter(
+        shard_urls=parse_shard_urls(settings.database_shards),
+        default_engine=ENGINE,
+        default_sessionmaker=SessionLocal,
+        route_ttl_seconds=settings.shard_route_ttl_seconds,
+    )
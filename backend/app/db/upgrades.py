@@ -0,0 +1,86 @@
+"""In-place upgrades of tables created before a schema change.
+
+``Base.metadata.create_all`` only creates missing tables, so columns and
+indexes added to existing tables are applied here, idempotently.
+"""
+
+from __future__ import annotations
+
+import logging
+
+from sqlalchemy import Connection, Engine, Table, func, inspect, select, text
+from sqlalchemy.orm import InstrumentedAttribute
+
+from app.models.ai_ticket import AiTicket
+from app.models.outlet import Outlet
+from app.models.partner import Partner
+
+logger = logging.getLogger("portal.backend")
+
+
+def upgrade_schema(engine: Engine) -> None:
+    """Add missing columns and indexes to existing tables."""
+
+    with engine.begin() as connection:
+        _add_ai_ticket_created_at(connection)
+        _add_index(connection, AiTicket.__table__, "ix_ai_tickets_outlet_id_id")
+        _add_unique_index(connection, Outlet.external_id, "ix_outlets_external_id")
+        _add_unique_index(connection, Partner.name, "ix_partners_name")
+
+
+def _add_index(connection: Connection, table: Table, name: str) -> None:
+    """Create the model index ``name`` of ``table`` unless it already exists."""
+
+    index = next(index for index in table.indexes if index.name == name)
+    index.create(connection, checkfirst=True)
+
+
+def _add_ai_ticket_created_at(connection: Connection) -> None:
+    """Add ``ai_tickets.created_at``, stamping existing tickets with now."""
+
+    columns = inspect(connection).get_columns("ai_tickets")
+    if any(column["name"] == "created_at" for column in columns):
+        return
+    if connection.dialect.name == "sqlite":
+        connection.execute(
+            text("ALTER TABLE ai_tickets ADD COLUMN created_at DATETIME")
+        )
+        connection.execute(text("UPDATE ai_tickets SET created_at = CURRENT_TIMESTAMP"))
+    else:
+        connection.execute(
+            text(
+                "ALTER TABLE ai_tickets ADD COLUMN created_at "
+                "TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now()"
+            )
+        )
+
+
+def _add_unique_index(
+    connection: Connection, column: InstrumentedAttribute, name: str
+) -> None:
+    """Create the unique model index ``name`` unless duplicates are stored.
+
+    Duplicates must be merged by hand; until then the index is skipped with a
+    warning and provisioning rows keyed by ``column`` fails on that shard.
+    """
+
+    table = column.class_.__table__
+    indexes = inspect(connection).get_indexes(table.name)
+    if any(index["name"] == name for index in indexes):
+        return
+    duplicates = connection.scalars(
+        select(column)
+        .where(column.is_not(None))
+        .group_by(column)
+        .having(func.count() > 1)
+        .limit(10)
+    ).all()
+    if duplicates:
+        logger.warning(
+            "%s values are not unique, index %s skipped: %s",
+            column,
+            name,
+            ", ".join(duplicates),
+        )
+        return
+    _add_index(connection, table, name)
@@ -5,14 +5,18 @@ from __future__ import annotations
 import logging
 import time
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from sqlalchemy.exc import SQLAlchemyError
 
 from app.api.router import api_router
+from app.core.compression import CompressionMiddleware
 from app.core.config import get_settings
 from app.db.init_db import init_db
-from app.db.session import SessionLocal
+from app.db.shards import DEFAULT_SHARD, PartnerMovingError, get_shard_router
+from app.services.kpi_store import get_kpi_store
+from app.services.user_directory import backfill_user_directory
 
 
 def _parse_cors_origins(origins: str) -> list[str]:
@@ -26,11 +30,18 @@ def _parse_cors_origins(origins: str) -> list[str]:
     return cleaned
 
 
-def create_app() -> FastAPI:
-    """Create and configure the FastAPI app."""
+def create_app(init_database: bool = True) -> FastAPI:
+    """Create and configure the FastAPI app.
+
+    ``init_database`` controls whether startup runs ``init_db``; the
+    multi-worker server runs it once in the master process instead.
+    """
 
     settings = get_settings()
     app = FastAPI(title=settings.app_name)
+    app.add_middleware(
+        CompressionMiddleware, minimum_size=settings.compression_minimum_size
+    )
     app.add_middleware(
         CORSMiddleware,
         allow_origins=_parse_cors_origins(settings.cors_allow_origins),
@@ -39,6 +50,8 @@ def create_app() -> FastAPI:
         allow_headers=["*"],
     )
     app.include_router(api_router)
+    app.add_exception_handler(PartnerMovingError, _partner_moving_response)
+    get_kpi_store()  # registers KPI write listeners when the store is enabled
 
     @app.get("/health")
     def health_check() -> dict[str, str]:
@@ -46,19 +59,32 @@ def create_app() -> FastAPI:
 
         return {"status": "ok"}
 
-    @app.on_event("startup")
-    def startup_init() -> None:
-        """Initialize database on startup."""
+    if init_database:
+
+        @app.on_event("startup")
+        def startup_init() -> None:
+            """Initialize database on startup."""
 
-        _init_db_with_retry()
+            init_db_with_retry()
 
     return app
 
 
+def _partner_moving_response(request: Request, exc: Exception) -> JSONResponse:
+    """Ask clients to retry writes refused while their partner moves shards."""
+
+    retry_after = round(get_settings().shard_route_ttl_seconds) + 5
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Data is being moved, retry shortly"},
+        headers={"Retry-After": str(retry_after)},
+    )
+
+
 app = create_app()
 
 
-def _init_db_with_retry(max_attempts: int = 5, delay_seconds: float = 2.0) -> None:
+def init_db_with_retry(max_attempts: int = 5, delay_seconds: float = 2.0) -> None:
     """Attempt database initialization with retries."""
 
     logger = logging.getLogger("portal.backend")
@@ -82,5 +108,8 @@ def _init_db_with_retry(max_attempts: int = 5, delay_seconds: float = 2.0) -> No
 def _try_init_db() -> None:
     """Run the database initialization once."""
 
-    with SessionLocal() as session:
+    shard_router = get_shard_router()
+    shard_router.create_all()
+    with shard_router.session_for_shard(DEFAULT_SHARD) as session:
         init_db(session)
+    backfill_user_directory(shard_router)
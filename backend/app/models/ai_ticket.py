@@ -3,8 +3,18 @@
 from __future__ import annotations
 
 import enum
-
-from sqlalchemy import Enum, ForeignKey, Integer, String, Text
+from datetime import datetime
+
+from sqlalchemy import (
+    DateTime,
+    Enum,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+    func,
+)
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.models.base import Base
@@ -29,6 +39,7 @@ class AiTicket(Base):
     """Represents an AI-generated recommendation ticket."""
 
     __tablename__ = "ai_tickets"
+    __table_args__ = (Index("ix_ai_tickets_outlet_id_id", "outlet_id", "id"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     outlet_id: Mapped[int] = mapped_column(ForeignKey("outlets.id"), nullable=False)
@@ -39,5 +50,13 @@ class AiTicket(Base):
     body: Mapped[str] = mapped_column(Text, nullable=False)
     action_label: Mapped[str] = mapped_column(String(120), nullable=False)
     status: Mapped[AiTicketStatus] = mapped_column(Enum(AiTicketStatus), nullable=False)
+    # The client-side default covers SQLite tables upgraded in place, which
+    # cannot add a column with a CURRENT_TIMESTAMP default.
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=func.now(),
+        server_default=func.now(),
+    )
 
     outlet = relationship("Outlet", back_populates="ai_tickets")
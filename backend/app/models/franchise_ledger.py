@@ -0,0 +1,65 @@
+"""Franchise ledger models."""
+
+from __future__ import annotations
+
+import enum
+from datetime import date, datetime
+
+from sqlalchemy import Date, DateTime, Enum, Float, ForeignKey, Integer, String, func
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+
+from app.models.base import Base
+
+
+class FranchiseChargeCategory(str, enum.Enum):
+    """Franchise obligation categories tracked in the ledger."""
+
+    royalty = "royalty"
+    marketing = "marketing"
+    supplies = "supplies"
+
+
+class FranchiseEntryKind(str, enum.Enum):
+    """Direction of a ledger entry."""
+
+    accrual = "accrual"
+    payment = "payment"
+
+
+class FranchiseLedgerEntry(Base):
+    """Represents an append-only accrual or payment for an outlet."""
+
+    __tablename__ = "franchise_ledger_entries"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    outlet_id: Mapped[int] = mapped_column(
+        ForeignKey("outlets.id"), nullable=False, index=True
+    )
+    category: Mapped[FranchiseChargeCategory] = mapped_column(
+        Enum(FranchiseChargeCategory), nullable=False
+    )
+    kind: Mapped[FranchiseEntryKind] = mapped_column(
+        Enum(FranchiseEntryKind), nullable=False
+    )
+    amount: Mapped[float] = mapped_column(Float, nullable=False)
+    posted_on: Mapped[date] = mapped_column(Date, nullable=False)
+    note: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
+
+    outlet = relationship("Outlet", back_populates="ledger_entries")
+
+
+class FranchiseBalance(Base):
+    """Materialized running balance of the ledger for an outlet."""
+
+    __tablename__ = "franchise_balances"
+
+    outlet_id: Mapped[int] = mapped_column(ForeignKey("outlets.id"), primary_key=True)
+    royalty_due: Mapped[float] = mapped_column(Float, nullable=False, default=0)
+    marketing_due: Mapped[float] = mapped_column(Float, nullable=False, default=0)
+    supplies_due: Mapped[float] = mapped_column(Float, nullable=False, default=0)
+    last_entry_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
+
+    outlet = relationship("Outlet", back_populates="franchise_balance")
@@ -0,0 +1,53 @@
+"""Transactional outbox model."""
+
+from __future__ import annotations
+
+import enum
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import JSON, DateTime, Enum, Index, Integer, String, Text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base
+
+
+class OutboxOperation(str, enum.Enum):
+    """Kind of row change recorded in the outbox."""
+
+    created = "created"
+    updated = "updated"
+    deleted = "deleted"
+
+
+class OutboxEvent(Base):
+    """Represents a domain row change awaiting delivery to consumers.
+
+    Events are written in the same transaction as the change and stay pending
+    until ``dispatched_at`` is set, or ``failed_at`` once retries run out.
+    """
+
+    __tablename__ = "outbox_events"
+    __table_args__ = (
+        Index("ix_outbox_events_pending", "dispatched_at", "failed_at", "id"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    aggregate: Mapped[str] = mapped_column(String(64), nullable=False)
+    aggregate_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    outlet_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    operation: Mapped[OutboxOperation] = mapped_column(
+        Enum(OutboxOperation), nullable=False
+    )
+    payload: Mapped[dict[str, Any]] = mapped_column(JSON, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False
+    )
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    last_error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    dispatched_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+    failed_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
@@ -2,7 +2,7 @@
 
 from __future__ import annotations
 
-from sqlalchemy import ForeignKey, Integer, String
+from sqlalchemy import ForeignKey, Index, Integer, String
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.models.base import Base
@@ -12,6 +12,7 @@ class Outlet(Base):
     """Represents a franchise outlet."""
 
     __tablename__ = "outlets"
+    __table_args__ = (Index("ix_outlets_external_id", "external_id", unique=True),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     name: Mapped[str] = mapped_column(String(255), nullable=False)
@@ -22,3 +23,8 @@ class Outlet(Base):
     kpis = relationship("KpiDaily", back_populates="outlet")
     ai_tickets = relationship("AiTicket", back_populates="outlet")
     franchise_debts = relationship("FranchiseDebt", back_populates="outlet")
+    profit_forecasts = relationship("ProfitForecast", back_populates="outlet")
+    ledger_entries = relationship("FranchiseLedgerEntry", back_populates="outlet")
+    franchise_balance = relationship(
+        "FranchiseBalance", back_populates="outlet", uselist=False
+    )
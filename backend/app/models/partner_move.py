@@ -0,0 +1,28 @@
+"""Partner move model."""
+
+from __future__ import annotations
+
+from datetime import datetime
+
+from sqlalchemy import DateTime, Integer, String, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base
+
+
+class PartnerMove(Base):
+    """Marks a partner whose rows are being moved to another shard.
+
+    Rows live in the default database. While a row exists, sessions opened
+    for the partner refuse writes.
+    """
+
+    __tablename__ = "partner_moves"
+
+    partner_id: Mapped[int] = mapped_column(
+        Integer, primary_key=True, autoincrement=False
+    )
+    target_shard: Mapped[str] = mapped_column(String(64), nullable=False)
+    started_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
@@ -0,0 +1,22 @@
+"""Partner shard routing model."""
+
+from __future__ import annotations
+
+from sqlalchemy import Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base
+
+
+class PartnerShard(Base):
+    """Maps a partner to the database shard holding its rows.
+
+    Rows live in the default database; partners without a row stay on it.
+    """
+
+    __tablename__ = "partner_shards"
+
+    partner_id: Mapped[int] = mapped_column(
+        Integer, primary_key=True, autoincrement=False
+    )
+    shard_name: Mapped[str] = mapped_column(String(64), nullable=False)
@@ -0,0 +1,25 @@
+"""Profit forecast model."""
+
+from __future__ import annotations
+
+from datetime import date
+
+from sqlalchemy import Date, Float, ForeignKey, Integer, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+
+from app.models.base import Base
+
+
+class ProfitForecast(Base):
+    """Represents an end-of-month forecast computed for an outlet as of a day."""
+
+    __tablename__ = "profit_forecasts"
+    __table_args__ = (UniqueConstraint("outlet_id", "as_of"),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    outlet_id: Mapped[int] = mapped_column(ForeignKey("outlets.id"), nullable=False)
+    as_of: Mapped[date] = mapped_column(Date, nullable=False)
+    revenue_forecast: Mapped[float] = mapped_column(Float, nullable=False)
+    profit_forecast: Mapped[float] = mapped_column(Float, nullable=False)
+
+    outlet = relationship("Outlet", back_populates="profit_forecasts")
@@ -0,0 +1,21 @@
+"""Shard id range model."""
+
+from __future__ import annotations
+
+from sqlalchemy import Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base
+
+
+class ShardIdRange(Base):
+    """Start of the block of ids a shard allocates new rows from.
+
+    Rows live in the default database, which owns the first block without
+    a row. Disjoint blocks keep ids unique when partners move between shards.
+    """
+
+    __tablename__ = "shard_id_ranges"
+
+    shard_name: Mapped[str] = mapped_column(String(64), primary_key=True)
+    range_start: Mapped[int] = mapped_column(Integer, nullable=False, unique=True)
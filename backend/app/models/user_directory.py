@@ -0,0 +1,20 @@
+"""User directory model."""
+
+from __future__ import annotations
+
+from sqlalchemy import Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base
+
+
+class UserDirectoryEntry(Base):
+    """Maps a user email to the partner whose shard holds the user.
+
+    Rows live in the default database, so emails are unique across shards.
+    """
+
+    __tablename__ = "user_directory"
+
+    email: Mapped[str] = mapped_column(String(255), primary_key=True)
+    partner_id: Mapped[int] = mapped_column(Integer, nullable=False)
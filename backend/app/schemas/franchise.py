@@ -2,7 +2,11 @@
 
 from __future__ import annotations
 
-from pydantic import BaseModel
+from datetime import date
+
+from pydantic import BaseModel, Field
+
+from app.models.franchise_ledger import FranchiseChargeCategory, FranchiseEntryKind
 
 
 class FranchiseSummary(BaseModel):
@@ -12,3 +16,24 @@ class FranchiseSummary(BaseModel):
     marketing_due: float
     supplies_due: float
     qsc_index: float
+
+
+class FranchiseLedgerEntryCreate(BaseModel):
+    """Payload for posting a ledger entry."""
+
+    category: FranchiseChargeCategory
+    kind: FranchiseEntryKind
+    amount: float = Field(gt=0)
+    posted_on: date | None = None
+    note: str | None = Field(default=None, max_length=255)
+
+
+class FranchiseLedgerEntryRead(BaseModel):
+    """Ledger entry data."""
+
+    id: int
+    category: FranchiseChargeCategory
+    kind: FranchiseEntryKind
+    amount: float
+    posted_on: date
+    note: str | None
@@ -0,0 +1,46 @@
+"""Bulk provisioning schemas."""
+
+from __future__ import annotations
+
+from pydantic import BaseModel, EmailStr, Field
+
+
+class ProvisionOutlet(BaseModel):
+    """Outlet to create, identified by its external id."""
+
+    external_id: str = Field(max_length=64)
+    name: str = Field(max_length=255)
+
+
+class ProvisionUser(BaseModel):
+    """User account to create."""
+
+    email: EmailStr
+    full_name: str = Field(max_length=255)
+    password: str
+
+
+class ProvisionPartner(BaseModel):
+    """Partner with the outlets and users to create for it."""
+
+    name: str = Field(max_length=255)
+    outlets: list[ProvisionOutlet] = Field(default_factory=list)
+    users: list[ProvisionUser] = Field(default_factory=list)
+
+
+class ProvisionRequest(BaseModel):
+    """Bulk provisioning payload."""
+
+    partners: list[ProvisionPartner]
+
+
+class ProvisionReport(BaseModel):
+    """Rows created by a provisioning run and rows that already existed."""
+
+    partners_created: int
+    outlets_created: int
+    outlets_skipped: int
+    # External ids requested for one partner but owned by another.
+    outlet_conflicts: list[str]
+    users_created: int
+    users_skipped: int
@@ -0,0 +1,12 @@
+"""Report export schemas."""
+
+from __future__ import annotations
+
+import enum
+
+
+class ExportFormat(str, enum.Enum):
+    """File formats supported by report exports."""
+
+    csv = "csv"
+    xlsx = "xlsx"
@@ -0,0 +1,23 @@
+"""Search schemas."""
+
+from __future__ import annotations
+
+from pydantic import BaseModel
+
+from app.schemas.dashboard import AiTicketRead
+from app.services.ticket_search import SearchMode
+
+
+class TicketSearchHit(AiTicketRead):
+    """AI ticket matching a search query."""
+
+    outlet_id: int
+    rank: float
+
+
+class TicketSearchPage(BaseModel):
+    """Page of ticket search hits."""
+
+    items: list[TicketSearchHit]
+    mode: SearchMode
+    next_cursor: str | None
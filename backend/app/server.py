@@ -0,0 +1,76 @@
+"""Production multi-worker server entrypoint."""
+
+from __future__ import annotations
+
+import logging
+import os
+from typing import Any
+
+from gunicorn.app.base import BaseApplication
+
+from app.core.config import Settings, get_settings
+from app.db.shards import get_shard_router
+from app.main import create_app, init_db_with_retry
+
+
+class PortalServer(BaseApplication):
+    """Gunicorn application running the API in Uvicorn worker processes.
+
+    The app is imported once in the master (``preload_app``) so workers share
+    its memory copy-on-write, and ``init_db`` runs there before any fork
+    instead of once per worker.
+    """
+
+    def __init__(self, options: dict[str, Any]) -> None:
+        self._options = options
+        super().__init__()
+
+    def load_config(self) -> None:
+        for key, value in self._options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        return create_app(init_database=False)
+
+
+def build_options(settings: Settings) -> dict[str, Any]:
+    """Return Gunicorn settings derived from application settings."""
+
+    return {
+        "bind": f"0.0.0.0:{settings.port}",
+        "workers": settings.web_concurrency or os.cpu_count() or 1,
+        "worker_class": "uvicorn.workers.UvicornWorker",
+        "preload_app": True,
+        "max_requests": settings.web_max_requests,
+        "max_requests_jitter": settings.web_max_requests_jitter,
+        "keepalive": settings.web_keepalive_seconds,
+        "backlog": settings.web_backlog,
+        "timeout": settings.web_timeout_seconds,
+        "graceful_timeout": settings.web_graceful_timeout_seconds,
+        "post_fork": _post_fork,
+        "accesslog": "-",
+    }
+
+
+def _post_fork(server: Any, worker: Any) -> None:
+    """Drop pooled connections inherited from the master process."""
+
+    get_shard_router().dispose(close=False)
+
+
+def main() -> None:
+    """Initialize the database once, then serve with a pool of workers.
+
+    Gunicorn treats SIGTERM as a graceful shutdown: workers stop accepting
+    connections and finish in-flight requests within the graceful timeout.
+    """
+
+    logging.basicConfig(level=logging.INFO)
+    settings = get_settings()
+    init_db_with_retry()
+    get_shard_router().dispose()
+    PortalServer(build_options(settings)).run()
+
+
+if __name__ == "__main__":
+    main()
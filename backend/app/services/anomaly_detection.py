@@ -0,0 +1,294 @@
+"""Vectorized KPI anomaly detection producing AI tickets.
+
+Usage::
+
+    python -m app.services.anomaly_detection [--as-of YYYY-MM-DD]
+"""
+
+from __future__ import annotations
+
+import argparse
+import enum
+import logging
+from collections.abc import Collection
+from dataclasses import dataclass
+from datetime import date
+
+import numpy as np
+from sqlalchemy import Select, insert, select
+from sqlalchemy.orm import Session
+
+from app.core.config import Settings, get_settings
+from app.models.ai_ticket import AiTicket, AiTicketSeverity, AiTicketStatus
+from app.models.outbox import OutboxOperation
+from app.models.outlet import Outlet
+from app.services.kpi_window import KpiSnapshot, load_kpi_snapshot
+from app.services.outbox import record_events
+
+logger = logging.getLogger("portal.backend")
+
+
+class AnomalyKind(str, enum.Enum):
+    """Kinds of KPI anomalies the engine detects."""
+
+    labor_cost = "labor_cost"
+    food_cost = "food_cost"
+    revenue_drop = "revenue_drop"
+    plan_gap = "plan_gap"
+
+
+_TICKET_TITLES = {
+    AnomalyKind.labor_cost: "ФОТ превышен",
+    AnomalyKind.food_cost: "Фудкост превышен",
+    AnomalyKind.revenue_drop: "Падение выручки",
+    AnomalyKind.plan_gap: "Отставание от плана",
+}
+
+_TICKET_ACTIONS = {
+    AnomalyKind.labor_cost: "Исправить график",
+    AnomalyKind.food_cost: "Проверить списания",
+    AnomalyKind.revenue_drop: "Запустить акцию",
+    AnomalyKind.plan_gap: "Открыть отчет",
+}
+
+
+@dataclass(frozen=True)
+class Anomaly:
+    """A single detected anomaly for an outlet on the snapshot day."""
+
+    outlet_id: int
+    kind: AnomalyKind
+    severity: AiTicketSeverity
+    value: float
+    reference: float
+    amount: float
+
+
+def detect_anomalies(snapshot: KpiSnapshot, settings: Settings) -> list[Anomaly]:
+    """Detect anomalies on the snapshot day for every outlet."""
+
+    if snapshot.outlet_ids.size == 0:
+        return []
+
+    revenue = snapshot.revenue
+    reported = ~np.isnan(revenue)
+    anomalies: list[Anomaly] = []
+
+    cost_checks = (
+        (
+            AnomalyKind.labor_cost,
+            snapshot.labor_cost_percent,
+            settings.anomaly_labor_cost_limit,
+        ),
+        (
+            AnomalyKind.food_cost,
+            snapshot.food_cost_percent,
+            settings.anomaly_food_cost_limit,
+        ),
+    )
+    for kind, current, limit in cost_checks:
+        overrun = np.where(reported, current - limit, np.nan)
+        flagged = overrun > 0
+        critical = overrun >= settings.anomaly_cost_critical_margin
+        overspend = revenue * overrun / 100
+        anomalies.extend(
+            _collect(snapshot, kind, flagged, critical, current, limit, overspend)
+        )
+
+    baseline = snapshot.revenue_mean
+    spread = snapshot.revenue_std
+    history = snapshot.revenue_days
+    with np.errstate(divide="ignore", invalid="ignore"):
+        z_scores = (revenue - baseline) / spread
+        drop_percent = (1 - revenue / baseline) * 100
+    eligible = reported & (history >= settings.anomaly_min_history_days) & (spread > 0)
+    flagged = eligible & (z_scores <= -settings.anomaly_revenue_z_threshold)
+    critical = z_scores <= -settings.anomaly_revenue_critical_z
+    anomalies.extend(
+        _collect(
+            snapshot,
+            AnomalyKind.revenue_drop,
+            flagged,
+            critical,
+            drop_percent,
+            z_scores,
+            baseline - revenue,
+        )
+    )
+
+    plan_percent = snapshot.plan_percent
+    plan_gap = np.where(reported, 100 - plan_percent, np.nan)
+    # A zero plan (a closed day) has no shortfall to report.
+    flagged = (plan_gap >= settings.anomaly_plan_gap_warning) & (plan_percent > 0)
+    critical = plan_gap >= settings.anomaly_plan_gap_critical
+    with np.errstate(divide="ignore", invalid="ignore"):
+        shortfall = revenue * 100 / plan_percent - revenue
+    anomalies.extend(
+        _collect(
+            snapshot,
+            AnomalyKind.plan_gap,
+            flagged,
+            critical,
+            plan_percent,
+            100.0,
+            shortfall,
+        )
+    )
+    return anomalies
+
+
+def generate_ai_tickets(
+    session: Session,
+    as_of: date | None = None,
+    settings: Settings | None = None,
+    outlet_ids: Collection[int] | Select | None = None,
+) -> int:
+    """Detect anomalies across outlets and persist them as AI tickets.
+
+    Outlets that already have an open ticket of the same kind are skipped, so
+    running the job repeatedly does not duplicate tickets. ``outlet_ids``, a
+    collection or a select of ids, limits detection to the given outlets.
+    """
+
+    settings = settings or get_settings()
+    as_of = as_of or date.today()
+    snapshot = load_kpi_snapshot(
+        session, as_of, settings.anomaly_window_days, outlet_ids=outlet_ids
+    )
+    anomalies = detect_anomalies(snapshot, settings)
+    if not anomalies:
+        return 0
+
+    open_tickets = select(AiTicket.outlet_id, AiTicket.title).where(
+        AiTicket.status == AiTicketStatus.open,
+        AiTicket.title.in_(_TICKET_TITLES.values()),
+    )
+    if outlet_ids is not None:
+        open_tickets = open_tickets.where(AiTicket.outlet_id.in_(outlet_ids))
+    existing = set(session.execute(open_tickets).all())
+    tickets = [
+        ticket
+        for ticket in (_render_ticket(anomaly) for anomaly in anomalies)
+        if (ticket["outlet_id"], ticket["title"]) not in existing
+    ]
+    if tickets:
+        ids = session.scalars(
+            insert(AiTicket).returning(AiTicket.id, sort_by_parameter_order=True),
+            tickets,
+        ).all()
+        record_events(
+            session,
+            AiTicket,
+            OutboxOperation.created,
+            [{"id": id_, **ticket} for id_, ticket in zip(ids, tickets)],
+        )
+    session.commit()
+    return len(tickets)
+
+
+def _collect(
+    snapshot: KpiSnapshot,
+    kind: AnomalyKind,
+    flagged: np.ndarray,
+    critical: np.ndarray,
+    value: np.ndarray,
+    reference: np.ndarray | float,
+    amount: np.ndarray,
+) -> list[Anomaly]:
+    """Materialize flagged rows of vectorized metrics into anomalies.
+
+    Rows whose ``amount`` is not finite are dropped, since no ticket can
+    state it.
+    """
+
+    indices = np.flatnonzero(flagged & np.isfinite(amount))
+    if indices.size == 0:
+        return []
+    reference = np.broadcast_to(reference, flagged.shape)
+    return [
+        Anomaly(
+            outlet_id=int(snapshot.outlet_ids[index]),
+            kind=kind,
+            severity=(
+                AiTicketSeverity.critical
+                if critical[index]
+                else AiTicketSeverity.warning
+            ),
+            value=float(value[index]),
+            reference=float(reference[index]),
+            amount=float(amount[index]),
+        )
+        for index in indices
+    ]
+
+
+def _render_ticket(anomaly: Anomaly) -> dict[str, object]:
+    """Build AI ticket column values for an anomaly."""
+
+    amount = _format_rubles(anomaly.amount)
+    if anomaly.kind is AnomalyKind.labor_cost:
+        body = (
+            f"ФОТ {anomaly.value:.1f}% при норме {anomaly.reference:.0f}%. "
+            f"Перерасход {amount} ₽."
+        )
+    elif anomaly.kind is AnomalyKind.food_cost:
+        body = (
+            f"Фудкост {anomaly.value:.1f}% при норме {anomaly.reference:.0f}%. "
+            f"Перерасход {amount} ₽."
+        )
+    elif anomaly.kind is AnomalyKind.revenue_drop:
+        body = (
+            f"Выручка на {anomaly.value:.0f}% ниже средней "
+            f"(z = {anomaly.reference:.1f}). Недобор {amount} ₽."
+        )
+    else:
+        body = f"План выполнен на {anomaly.value:.0f}%. Недобор {amount} ₽."
+
+    return {
+        "outlet_id": anomaly.outlet_id,
+        "severity": anomaly.severity,
+        "title": _TICKET_TITLES[anomaly.kind],
+        "body": body,
+        "action_label": _TICKET_ACTIONS[anomaly.kind],
+        "status": AiTicketStatus.open,
+    }
+
+
+def _format_rubles(amount: float) -> str:
+    """Format an amount in rubles with space grouping like ``8 500``."""
+
+    return f"{round(amount):,}".replace(",", " ")
+
+
+def main() -> None:
+    """Generate AI tickets for every outlet of every shard.
+
+    Outlets of partners being moved, or living on another shard, are left
+    for the next run.
+    """
+
+    import app.db.init_db  # noqa: F401  (registers every mapped model)
+    from app.db.shards import get_shard_router
+
+    parser = argparse.ArgumentParser(description="Generate AI tickets.")
+    parser.add_argument(
+        "--as-of", type=date.fromisoformat, default=None, help="day to analyze"
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    shard_router = get_shard_router()
+    shard_router.create_all()
+    for shard in shard_router.shard_names():
+        outlet_ids = select(Outlet.id).where(
+            shard_router.owned_partners(shard, Outlet.partner_id)
+        )
+        with shard_router.session_for_shard(shard) as session:
+            created = generate_ai_tickets(
+                session, as_of=args.as_of, outlet_ids=outlet_ids
+            )
+        logger.info("Shard %s: %s AI tickets created", shard, created)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,316 @@
+"""Franchise ledger posting and balance reconciliation.
+
+Usage::
+
+    python -m app.services.franchise_ledger [--repair]
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import sys
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import date
+from functools import partial
+from typing import Any
+
+from sqlalchemy import case, func, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.models.franchise_debt import FranchiseDebt
+from app.models.franchise_ledger import (
+    FranchiseBalance,
+    FranchiseChargeCategory,
+    FranchiseEntryKind,
+    FranchiseLedgerEntry,
+)
+from app.models.outlet import Outlet
+
+logger = logging.getLogger("portal.backend")
+
+_BALANCE_COLUMNS = {
+    FranchiseChargeCategory.royalty: FranchiseBalance.royalty_due,
+    FranchiseChargeCategory.marketing: FranchiseBalance.marketing_due,
+    FranchiseChargeCategory.supplies: FranchiseBalance.supplies_due,
+}
+_TOLERANCE = 0.005
+
+
+@dataclass(frozen=True)
+class BalanceMismatch:
+    """Difference between a materialized balance and its ledger sum."""
+
+    outlet_id: int
+    category: FranchiseChargeCategory
+    stored: float
+    expected: float
+
+
+def post_entry(
+    session: Session,
+    outlet_id: int,
+    category: FranchiseChargeCategory,
+    kind: FranchiseEntryKind,
+    amount: float,
+    posted_on: date | None = None,
+    note: str | None = None,
+) -> FranchiseLedgerEntry:
+    """Append a ledger entry and apply it to the outlet balance atomically.
+
+    The balance is adjusted with a single ``UPDATE ... SET due = due + delta``
+    in the same transaction as the entry insert, so concurrent postings for
+    one outlet serialize on the balance row instead of overwriting each other.
+    The caller commits, which lets several postings share one transaction.
+    """
+
+    if amount <= 0:
+        raise ValueError("Ledger amount must be positive")
+
+    entry = FranchiseLedgerEntry(
+        outlet_id=outlet_id,
+        category=category,
+        kind=kind,
+        amount=amount,
+        posted_on=posted_on or date.today(),
+        note=note,
+    )
+    session.add(entry)
+    session.flush()
+
+    _ensure_balance(session, outlet_id)
+    column = _BALANCE_COLUMNS[category]
+    delta = amount if kind is FranchiseEntryKind.accrual else -amount
+    session.execute(
+        update(FranchiseBalance)
+        .where(FranchiseBalance.outlet_id == outlet_id)
+        .values({column: column + delta, FranchiseBalance.last_entry_id: entry.id})
+    )
+    return entry
+
+
+def reconcile_balances(
+    session: Session,
+    repair: bool = False,
+    owned_partners: Callable[[Any], ColumnElement[bool]] | None = None,
+) -> list[BalanceMismatch]:
+    """Compare every materialized balance with the sum of its ledger.
+
+    Balances and grouped ledger sums are read in one statement, so a posting
+    committed meanwhile cannot show up as a mismatch. With ``repair`` each
+    mismatched balance is locked first and set from ledger sums recomputed
+    under that lock, so postings made since the check are kept. With
+    ``owned_partners`` (see ``ShardRouter.owned_partners``) outlets of
+    partners being moved or living on another shard are skipped.
+    """
+
+    sums = (
+        select(
+            FranchiseLedgerEntry.outlet_id,
+            *(
+                func.sum(
+                    case(
+                        (FranchiseLedgerEntry.category == category, _signed_amount()),
+                        else_=0.0,
+                    )
+                ).label(category.value)
+                for category in _BALANCE_COLUMNS
+            ),
+        )
+        .group_by(FranchiseLedgerEntry.outlet_id)
+        .subquery()
+    )
+    stmt = (
+        select(
+            Outlet.id,
+            *(sums.c[category.value] for category in _BALANCE_COLUMNS),
+            *_BALANCE_COLUMNS.values(),
+        )
+        .outerjoin(sums, sums.c.outlet_id == Outlet.id)
+        .outerjoin(FranchiseBalance, FranchiseBalance.outlet_id == Outlet.id)
+        .order_by(Outlet.id)
+    )
+    if owned_partners is not None:
+        stmt = stmt.where(owned_partners(Outlet.partner_id))
+    rows = session.execute(stmt).all()
+
+    mismatches: list[BalanceMismatch] = []
+    categories = list(_BALANCE_COLUMNS)
+    for outlet_id, *values in rows:
+        totals, stored = values[: len(categories)], values[len(categories) :]
+        for category, total, due in zip(categories, totals, stored):
+            if abs((due or 0.0) - (total or 0.0)) > _TOLERANCE:
+                mismatches.append(
+                    BalanceMismatch(
+                        outlet_id=outlet_id,
+                        category=category,
+                        stored=due or 0.0,
+                        expected=total or 0.0,
+                    )
+                )
+
+    if repair:
+        # Each outlet is repaired in its own short transaction.
+        session.rollback()
+        for outlet_id in sorted({mismatch.outlet_id for mismatch in mismatches}):
+            # A move may have started since the check.
+            if owned_partners is not None and not session.scalar(
+                select(Outlet.id).where(
+                    Outlet.id == outlet_id, owned_partners(Outlet.partner_id)
+                )
+            ):
+                logger.info("Outlet %s is being moved, repair skipped", outlet_id)
+                session.rollback()
+                continue
+            _repair_balance(session, outlet_id)
+    return mismatches
+
+
+def _repair_balance(session: Session, outlet_id: int) -> None:
+    """Reset an outlet's balance to its ledger sums under the balance row lock."""
+
+    _ensure_balance(session, outlet_id)
+    # A no-op update takes the row lock on PostgreSQL and the write lock on
+    # SQLite, so postings for the outlet wait until the repair commits and
+    # the sums below include every posting committed before it.
+    session.execute(
+        update(FranchiseBalance)
+        .where(FranchiseBalance.outlet_id == outlet_id)
+        .values(last_entry_id=FranchiseBalance.last_entry_id)
+    )
+    totals = dict(
+        session.execute(
+            select(FranchiseLedgerEntry.category, func.sum(_signed_amount()))
+            .where(FranchiseLedgerEntry.outlet_id == outlet_id)
+            .group_by(FranchiseLedgerEntry.category)
+        ).all()
+    )
+    session.execute(
+        update(FranchiseBalance)
+        .where(FranchiseBalance.outlet_id == outlet_id)
+        .values(
+            {
+                column: totals.get(category, 0.0)
+                for category, column in _BALANCE_COLUMNS.items()
+            }
+        )
+    )
+    session.commit()
+
+
+def _signed_amount() -> Any:
+    """Return the ledger amount signed by direction: accruals add, payments pay."""
+
+    return case(
+        (
+            FranchiseLedgerEntry.kind == FranchiseEntryKind.accrual,
+            FranchiseLedgerEntry.amount,
+        ),
+        else_=-FranchiseLedgerEntry.amount,
+    )
+
+
+def open_balances_from_debts(session: Session) -> int:
+    """Post opening accruals for outlets that only have legacy debt rows.
+
+    Each outlet's accruals and balance row are committed together, so an
+    interrupted run never leaves a balance without its opening entries.
+    """
+
+    debts = session.scalars(
+        select(FranchiseDebt).where(
+            FranchiseDebt.outlet_id.not_in(select(FranchiseBalance.outlet_id))
+        )
+    ).all()
+    opened: set[int] = set()
+    for debt in debts:
+        if debt.outlet_id in opened:
+            continue
+        for category, column in _BALANCE_COLUMNS.items():
+            amount = getattr(debt, column.key)
+            if amount > 0:
+                post_entry(
+                    session,
+                    debt.outlet_id,
+                    category,
+                    FranchiseEntryKind.accrual,
+                    amount,
+                    note="Входящий остаток",
+                )
+        _ensure_balance(session, debt.outlet_id)
+        session.commit()
+        opened.add(debt.outlet_id)
+    return len(opened)
+
+
+def _ensure_balance(session: Session, outlet_id: int) -> None:
+    """Create a zero balance row for an outlet if it does not exist yet."""
+
+    if session.get(FranchiseBalance, outlet_id) is not None:
+        return
+    try:
+        with session.begin_nested():
+            session.execute(
+                insert(FranchiseBalance).values(
+                    outlet_id=outlet_id,
+                    royalty_due=0,
+                    marketing_due=0,
+                    supplies_due=0,
+                )
+            )
+    except IntegrityError:
+        pass
+
+
+def main() -> None:
+    """Reconcile ledger balances on every shard from the command line.
+
+    Exits with status 1 when mismatches are found and not repaired.
+    """
+
+    import app.db.init_db  # noqa: F401  (registers every mapped model)
+    from app.db.shards import get_shard_router
+
+    parser = argparse.ArgumentParser(description="Reconcile franchise balances.")
+    parser.add_argument(
+        "--repair", action="store_true", help="overwrite balances with ledger sums"
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    shard_router = get_shard_router()
+    shard_router.create_all()
+    unrepaired = 0
+    for shard in shard_router.shard_names():
+        with shard_router.session_for_shard(shard) as session:
+            mismatches = reconcile_balances(
+                session,
+                repair=args.repair,
+                owned_partners=partial(shard_router.owned_partners, shard),
+            )
+        for mismatch in mismatches:
+            logger.warning(
+                "Shard %s outlet %s %s: stored %.2f, ledger %.2f",
+                shard,
+                mismatch.outlet_id,
+                mismatch.category.value,
+                mismatch.stored,
+                mismatch.expected,
+            )
+        logger.info(
+            "Shard %s: %s mismatches%s",
+            shard,
+            len(mismatches),
+            " repaired" if args.repair and mismatches else "",
+        )
+        if not args.repair:
+            unrepaired += len(mismatches)
+    if unrepaired:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
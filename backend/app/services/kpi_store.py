@@ -0,0 +1,247 @@
+"""In-process columnar KPI time-series store."""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+from functools import lru_cache
+from typing import Any
+
+import numpy as np
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.models.kpi import KpiDaily
+
+_PENDING_KEY = "kpi_store_pending"
+
+_COLUMN_TYPES = {
+    "day": np.int32,
+    "revenue": np.float64,
+    "checks": np.int32,
+    "labor_cost_percent": np.float32,
+    "food_cost_percent": np.float32,
+}
+
+
+class OutletSeries:
+    """Day-ordered KPI columns of one outlet backed by NumPy arrays.
+
+    Updates replace ``columns`` with new arrays instead of writing into the
+    current ones, so views handed to readers never change underneath them.
+    """
+
+    __slots__ = ("columns", "loaded_at")
+
+    def __init__(self, columns: dict[str, np.ndarray]) -> None:
+        self.columns = columns
+        self.loaded_at = time.monotonic()
+
+    @classmethod
+    def from_rows(cls, rows: list[Any]) -> OutletSeries:
+        """Build a series from ``(day, revenue, checks, labor, food)`` rows."""
+
+        columns = {
+            name: np.fromiter(
+                (
+                    row[index].toordinal() if name == "day" else row[index]
+                    for row in rows
+                ),
+                dtype=dtype,
+                count=len(rows),
+            )
+            for index, (name, dtype) in enumerate(_COLUMN_TYPES.items())
+        }
+        return cls(columns)
+
+    @property
+    def nbytes(self) -> int:
+        """Return the memory held by the column arrays."""
+
+        return sum(column.nbytes for column in self.columns.values())
+
+    def upsert(self, day: date, values: dict[str, float]) -> None:
+        """Insert or replace the values for a day, keeping day order."""
+
+        ordinal = day.toordinal()
+        days = self.columns["day"]
+        position = int(np.searchsorted(days, ordinal))
+        if position < days.size and days[position] == ordinal:
+            columns = dict(self.columns)
+            for name, value in values.items():
+                columns[name] = columns[name].copy()
+                columns[name][position] = value
+            self.columns = columns
+            return
+        row = {"day": ordinal, **values}
+        self.columns = {
+            name: np.insert(column, position, row[name])
+            for name, column in self.columns.items()
+        }
+
+    def remove(self, day: date) -> None:
+        """Drop the values for a day if present."""
+
+        ordinal = day.toordinal()
+        days = self.columns["day"]
+        position = int(np.searchsorted(days, ordinal))
+        if position < days.size and days[position] == ordinal:
+            self.columns = {
+                name: np.delete(column, position)
+                for name, column in self.columns.items()
+            }
+
+    def between(self, start: date, end: date) -> dict[str, np.ndarray]:
+        """Return column views for days in the inclusive range."""
+
+        columns = self.columns
+        days = columns["day"]
+        lower = np.searchsorted(days, start.toordinal(), side="left")
+        upper = np.searchsorted(days, end.toordinal(), side="right")
+        return {name: column[lower:upper] for name, column in columns.items()}
+
+    def tail(self, count: int) -> dict[str, np.ndarray]:
+        """Return column views for the last ``count`` days."""
+
+        return {name: column[-count:] for name, column in self.columns.items()}
+
+
+class KpiSeriesStore:
+    """LRU cache of per-outlet KPI series bounded by total array memory.
+
+    Series are hydrated from the database on first access and refreshed after
+    ``ttl_seconds`` so writes made by other worker processes become visible.
+    Writes committed in this process are applied as deltas immediately; a
+    hydration that overlaps such a write is returned but not cached, so the
+    older snapshot cannot overwrite the delta.
+    """
+
+    def __init__(self, max_bytes: int, ttl_seconds: float) -> None:
+        self._series: OrderedDict[int, OutletSeries] = OrderedDict()
+        self._lock = threading.Lock()
+        self._max_bytes = max_bytes
+        self._ttl_seconds = ttl_seconds
+        self._bytes = 0
+        self._versions: dict[int, int] = {}
+
+    @property
+    def nbytes(self) -> int:
+        """Return the memory held by all resident series."""
+
+        return self._bytes
+
+    def __len__(self) -> int:
+        return len(self._series)
+
+    def get(self, session: Session, outlet_id: int) -> OutletSeries:
+        """Return the series of an outlet, hydrating it when cold or stale."""
+
+        with self._lock:
+            series = self._series.get(outlet_id)
+            if series is not None and not self._expired(series):
+                self._series.move_to_end(outlet_id)
+                return series
+            version = self._versions.get(outlet_id, 0)
+
+        rows = session.execute(
+            select(
+                KpiDaily.day,
+                KpiDaily.revenue,
+                KpiDaily.checks,
+                KpiDaily.labor_cost_percent,
+                KpiDaily.food_cost_percent,
+            )
+            .where(KpiDaily.outlet_id == outlet_id)
+            .order_by(KpiDaily.day)
+        ).all()
+        series = OutletSeries.from_rows(rows)
+        with self._lock:
+            if self._versions.get(outlet_id, 0) == version:
+                self._replace(outlet_id, series)
+        return series
+
+    def apply(
+        self, outlet_id: int, day: date, values: dict[str, float] | None
+    ) -> None:
+        """Apply a committed KPI row change, ``None`` values meaning deletion."""
+
+        with self._lock:
+            self._versions[outlet_id] = self._versions.get(outlet_id, 0) + 1
+            series = self._series.get(outlet_id)
+            if series is None:
+                return
+            before = series.nbytes
+            if values is None:
+                series.remove(day)
+            else:
+                series.upsert(day, values)
+            self._bytes += series.nbytes - before
+            self._evict()
+
+    def _expired(self, series: OutletSeries) -> bool:
+        return time.monotonic() - series.loaded_at > self._ttl_seconds
+
+    def _replace(self, outlet_id: int, series: OutletSeries) -> None:
+        previous = self._series.pop(outlet_id, None)
+        if previous is not None:
+            self._bytes -= previous.nbytes
+        self._series[outlet_id] = series
+        self._bytes += series.nbytes
+        self._evict()
+
+    def _evict(self) -> None:
+        while self._bytes > self._max_bytes and len(self._series) > 1:
+            _, series = self._series.popitem(last=False)
+            self._bytes -= series.nbytes
+
+
+@lru_cache
+def get_kpi_store() -> KpiSeriesStore | None:
+    """Return the process-wide KPI store, or None when it is disabled."""
+
+    settings = get_settings()
+    if not settings.kpi_store_enabled:
+        return None
+    store = KpiSeriesStore(
+        max_bytes=settings.kpi_store_max_bytes,
+        ttl_seconds=settings.kpi_store_ttl_seconds,
+    )
+    _listen_for_kpi_writes(store)
+    return store
+
+
+def _listen_for_kpi_writes(store: KpiSeriesStore) -> None:
+    """Feed KPI rows flushed through ORM sessions into the store on commit."""
+
+    @event.listens_for(Session, "after_flush")
+    def collect(session: Session, flush_context: Any) -> None:
+        pending = session.info.setdefault(_PENDING_KEY, [])
+        for obj in (*session.new, *session.dirty):
+            if isinstance(obj, KpiDaily):
+                pending.append((obj.outlet_id, obj.day, _series_values(obj)))
+        for obj in session.deleted:
+            if isinstance(obj, KpiDaily):
+                pending.append((obj.outlet_id, obj.day, None))
+
+    @event.listens_for(Session, "after_commit")
+    def apply(session: Session) -> None:
+        for outlet_id, day, values in session.info.pop(_PENDING_KEY, []):
+            store.apply(outlet_id, day, values)
+
+    @event.listens_for(Session, "after_rollback")
+    def discard(session: Session) -> None:
+        session.info.pop(_PENDING_KEY, None)
+
+
+def _series_values(kpi: KpiDaily) -> dict[str, float]:
+    """Return the stored columns of a KPI row, excluding the day."""
+
+    return {
+        "revenue": kpi.revenue,
+        "checks": kpi.checks,
+        "labor_cost_percent": kpi.labor_cost_percent,
+        "food_cost_percent": kpi.food_cost_percent,
+    }
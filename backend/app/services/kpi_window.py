@@ -0,0 +1,211 @@
+"""Columnar loading of recent KPI history and per-outlet KPI snapshots."""
+
+from __future__ import annotations
+
+from collections.abc import Collection
+from dataclasses import dataclass
+from datetime import date, timedelta
+
+import numpy as np
+from sqlalchemy import ColumnElement, Integer, Select, case, cast, func, select
+from sqlalchemy.orm import Session
+
+from app.models.kpi import KpiDaily
+
+KPI_WINDOW_COLUMNS = (
+    "revenue",
+    "checks",
+    "plan_percent",
+    "labor_cost_percent",
+    "food_cost_percent",
+)
+KPI_SNAPSHOT_COLUMNS = (
+    "revenue",
+    "plan_percent",
+    "labor_cost_percent",
+    "food_cost_percent",
+)
+_FETCH_SIZE = 50000
+
+
+@dataclass(frozen=True)
+class KpiWindow:
+    """Dense outlet x day matrices of KPI values, NaN where a day is missing."""
+
+    outlet_ids: np.ndarray
+    start: date
+    revenue: np.ndarray
+    checks: np.ndarray
+    plan_percent: np.ndarray
+    labor_cost_percent: np.ndarray
+    food_cost_percent: np.ndarray
+
+    @property
+    def days(self) -> int:
+        """Return the number of days covered by the window."""
+
+        return self.revenue.shape[1]
+
+    @property
+    def end(self) -> date:
+        """Return the last day covered by the window."""
+
+        return self.start + timedelta(days=self.days - 1)
+
+
+@dataclass(frozen=True)
+class KpiSnapshot:
+    """KPI values of one day per outlet with trailing revenue statistics.
+
+    Day values are NaN for outlets that reported nothing that day. The revenue
+    mean, standard deviation and day count cover the window days before it.
+    """
+
+    outlet_ids: np.ndarray
+    day: date
+    revenue: np.ndarray
+    plan_percent: np.ndarray
+    labor_cost_percent: np.ndarray
+    food_cost_percent: np.ndarray
+    revenue_mean: np.ndarray
+    revenue_std: np.ndarray
+    revenue_days: np.ndarray
+
+
+def load_kpi_window(
+    session: Session,
+    as_of: date,
+    days: int,
+    outlet_ids: Collection[int] | None = None,
+) -> KpiWindow:
+    """Load the KPI window ending at ``as_of`` in one query.
+
+    The database returns each row's day as an offset from the window start,
+    and rows are read from the DBAPI cursor in batches straight into float
+    arrays, without ORM rows or per-row date objects. All outlets are loaded
+    unless ``outlet_ids`` narrows the selection.
+    """
+
+    start = as_of - timedelta(days=days - 1)
+    connection = session.connection()
+    stmt = select(
+        KpiDaily.outlet_id,
+        _day_offset(connection.dialect.name, start),
+        *(getattr(KpiDaily, name) for name in KPI_WINDOW_COLUMNS),
+    ).where(KpiDaily.day >= start, KpiDaily.day <= as_of)
+    if outlet_ids is not None:
+        stmt = stmt.where(KpiDaily.outlet_id.in_(outlet_ids))
+
+    result = connection.execute(stmt)
+    chunks = []
+    try:
+        while batch := result.cursor.fetchmany(_FETCH_SIZE):
+            chunks.append(np.array(batch, dtype=np.float64))
+    finally:
+        result.close()
+    data = (
+        np.concatenate(chunks)
+        if chunks
+        else np.empty((0, 2 + len(KPI_WINDOW_COLUMNS)))
+    )
+    values = {
+        name: data[:, index + 2] for index, name in enumerate(KPI_WINDOW_COLUMNS)
+    }
+    return build_kpi_window(
+        data[:, 0].astype(np.int64),
+        data[:, 1].astype(np.int64),
+        values,
+        start=start,
+        days=days,
+    )
+
+
+def load_kpi_snapshot(
+    session: Session,
+    as_of: date,
+    days: int,
+    outlet_ids: Collection[int] | Select | None = None,
+) -> KpiSnapshot:
+    """Load the ``as_of`` KPIs and trailing revenue statistics in one query.
+
+    The database groups the window by outlet, so one row per outlet crosses
+    the driver instead of one per outlet and day. ``outlet_ids``, a collection
+    or a select of ids, narrows the selection.
+    """
+
+    start = as_of - timedelta(days=days - 1)
+    current = KpiDaily.day == as_of
+    past = case((KpiDaily.day < as_of, KpiDaily.revenue))
+    stmt = (
+        select(
+            KpiDaily.outlet_id,
+            *(
+                func.max(case((current, getattr(KpiDaily, name))))
+                for name in KPI_SNAPSHOT_COLUMNS
+            ),
+            func.count(past),
+            func.avg(past),
+            func.avg(past * past),
+        )
+        .where(KpiDaily.day >= start, KpiDaily.day <= as_of)
+        .group_by(KpiDaily.outlet_id)
+        .order_by(KpiDaily.outlet_id)
+    )
+    if outlet_ids is not None:
+        stmt = stmt.where(KpiDaily.outlet_id.in_(outlet_ids))
+
+    result = session.connection().execute(stmt)
+    try:
+        rows = result.cursor.fetchall()
+    finally:
+        result.close()
+    # NULL aggregates, such as a day the outlet did not report, become NaN.
+    data = np.array(rows, dtype=np.float64).reshape(
+        len(rows), 4 + len(KPI_SNAPSHOT_COLUMNS)
+    )
+    values = {
+        name: data[:, index + 1] for index, name in enumerate(KPI_SNAPSHOT_COLUMNS)
+    }
+    count, mean, mean_square = data[:, -3:].T
+    variance = np.clip(mean_square - mean * mean, 0, None)
+    return KpiSnapshot(
+        outlet_ids=data[:, 0].astype(np.int64),
+        day=as_of,
+        revenue_mean=mean,
+        revenue_std=np.sqrt(variance),
+        revenue_days=count.astype(np.int64),
+        **values,
+    )
+
+
+def build_kpi_window(
+    outlet_ids: np.ndarray,
+    offsets: np.ndarray,
+    values: dict[str, np.ndarray],
+    start: date,
+    days: int,
+) -> KpiWindow:
+    """Scatter flat KPI columns into dense outlet x day matrices.
+
+    ``offsets`` holds each row's day as a number of days since ``start``.
+    """
+
+    in_range = (offsets >= 0) & (offsets < days)
+    unique_ids, rows = np.unique(outlet_ids[in_range], return_inverse=True)
+    offsets = offsets[in_range]
+
+    matrices: dict[str, np.ndarray] = {}
+    for name in KPI_WINDOW_COLUMNS:
+        matrix = np.full((unique_ids.size, days), np.nan)
+        matrix[rows, offsets] = values[name][in_range]
+        matrices[name] = matrix
+
+    return KpiWindow(outlet_ids=unique_ids, start=start, **matrices)
+
+
+def _day_offset(dialect: str, start: date) -> ColumnElement[int]:
+    """Return the SQL expression of ``KpiDaily.day`` minus ``start`` in days."""
+
+    if dialect == "sqlite":
+        return cast(func.julianday(KpiDaily.day) - func.julianday(start), Integer)
+    return KpiDaily.day - start
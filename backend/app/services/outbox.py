@@ -0,0 +1,357 @@
+"""Transactional outbox: change capture and at-least-once dispatch.
+
+Changes to tracked models are recorded as ``OutboxEvent`` rows in the same
+transaction as the change. Consumers register handlers per aggregate and
+the dispatcher delivers pending events to them in id order.
+
+Usage::
+
+    python -m app.services.outbox [--once]
+"""
+
+from __future__ import annotations
+
+import argparse
+import enum
+import logging
+import time
+from collections import defaultdict
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+from functools import partial
+from typing import Any
+
+from sqlalchemy import event, func, insert, inspect, or_, select
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.core.config import get_settings
+from app.models.ai_ticket import AiTicket
+from app.models.base import Base
+from app.models.franchise_debt import FranchiseDebt
+from app.models.franchise_ledger import FranchiseLedgerEntry
+from app.models.kpi import KpiDaily
+from app.models.outbox import OutboxEvent, OutboxOperation
+from app.models.outlet import Outlet
+
+logger = logging.getLogger("portal.backend")
+
+_TRACKED_MODELS = (KpiDaily, AiTicket, FranchiseDebt, FranchiseLedgerEntry)
+
+
+@dataclass(frozen=True)
+class OutboxMessage:
+    """Immutable view of an outbox event handed to handlers."""
+
+    id: int
+    aggregate: str
+    aggregate_id: int | None
+    outlet_id: int | None
+    operation: OutboxOperation
+    payload: dict[str, Any]
+    created_at: datetime
+
+
+Handler = Callable[[Session, OutboxMessage], None]
+
+_HANDLERS: dict[str, list[Handler]] = defaultdict(list)
+
+
+def outbox_handler(*aggregates: str) -> Callable[[Handler], Handler]:
+    """Register a handler for events of the given aggregates (table names).
+
+    Delivery is at least once, so handlers must be idempotent.
+    """
+
+    def register(handler: Handler) -> Handler:
+        for aggregate in aggregates:
+            _HANDLERS[aggregate].append(handler)
+        return handler
+
+    return register
+
+
+@event.listens_for(Session, "after_flush")
+def _capture_changes(session: Session, flush_context: Any) -> None:
+    """Write outbox rows for tracked objects flushed by the unit of work."""
+
+    now = _utcnow()
+    changes = [
+        *((obj, OutboxOperation.created) for obj in session.new),
+        *(
+            (obj, OutboxOperation.updated)
+            for obj in session.dirty
+            if session.is_modified(obj, include_collections=False)
+        ),
+        *((obj, OutboxOperation.deleted) for obj in session.deleted),
+    ]
+    rows = [
+        _event_row(obj, operation, now)
+        for obj, operation in changes
+        if isinstance(obj, _TRACKED_MODELS)
+    ]
+    if rows:
+        session.connection().execute(insert(OutboxEvent), rows)
+
+
+def record_events(
+    session: Session,
+    model: type[Base],
+    operation: OutboxOperation,
+    rows: Iterable[dict[str, Any]],
+) -> None:
+    """Record outbox events for rows written with bulk Core statements.
+
+    Bulk ``insert()``/``update()`` bypass the unit of work and its flush
+    events, so callers pass the written rows, including ``id``, here.
+    """
+
+    now = _utcnow()
+    events = [
+        {
+            "aggregate": model.__tablename__,
+            "aggregate_id": row.get("id"),
+            "outlet_id": row.get("outlet_id"),
+            "operation": operation,
+            "payload": {key: _json_value(value) for key, value in row.items()},
+            "created_at": now,
+        }
+        for row in rows
+    ]
+    if events:
+        session.execute(insert(OutboxEvent), events)
+
+
+@dataclass
+class DispatchStats:
+    """Outcome of one dispatch batch."""
+
+    fetched: int = 0
+    delivered: int = 0
+    retried: int = 0
+    failed: int = 0
+    lag_seconds: float = 0.0
+
+
+@dataclass(frozen=True)
+class OutboxBacklog:
+    """Pending events and the age of the oldest one."""
+
+    pending: int
+    oldest_age_seconds: float
+
+
+class OutboxDispatcher:
+    """Delivers pending outbox events of one database to registered handlers.
+
+    Events are fetched oldest first and marked dispatched in one transaction
+    per batch once their handlers succeed and commit; a crash before the commit
+    redelivers the whole batch. When an event fails, later events of the
+    same outlet in the batch are held back so each outlet sees its events
+    in order. Events failing ``max_attempts`` times are parked with
+    ``failed_at`` set. With ``owned_partners`` (see
+    ``ShardRouter.owned_partners``) events of outlets whose partner is being
+    moved or lives on another shard are left pending.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        batch_size: int,
+        max_attempts: int,
+        handlers: dict[str, list[Handler]] | None = None,
+        owned_partners: Callable[[Any], ColumnElement[bool]] | None = None,
+    ) -> None:
+        self._session_factory = session_factory
+        self.batch_size = batch_size
+        self._max_attempts = max_attempts
+        self._handlers = _HANDLERS if handlers is None else handlers
+        self._owned_partners = owned_partners
+
+    def dispatch_batch(self) -> DispatchStats:
+        """Deliver up to one batch of pending events."""
+
+        stats = DispatchStats()
+        stmt = _pending(select(OutboxEvent))
+        if self._owned_partners is not None:
+            owned = select(Outlet.id).where(self._owned_partners(Outlet.partner_id))
+            stmt = stmt.where(
+                or_(OutboxEvent.outlet_id.is_(None), OutboxEvent.outlet_id.in_(owned))
+            )
+        with self._session_factory() as session, self._session_factory() as work:
+            events = session.scalars(
+                stmt.order_by(OutboxEvent.id)
+                .limit(self.batch_size)
+                .with_for_update()
+            ).all()
+            stats.fetched = len(events)
+            held: set[int | None] = set()
+            for outbox_event in events:
+                if outbox_event.outlet_id in held:
+                    continue
+                try:
+                    self._deliver(work, _message(outbox_event))
+                    work.commit()
+                except Exception as exc:
+                    work.rollback()
+                    outbox_event.attempts += 1
+                    outbox_event.last_error = repr(exc)
+                    logger.exception(
+                        "Outbox event %s (%s) failed, attempt %s",
+                        outbox_event.id,
+                        outbox_event.aggregate,
+                        outbox_event.attempts,
+                    )
+                    if outbox_event.attempts >= self._max_attempts:
+                        outbox_event.failed_at = _utcnow()
+                        stats.failed += 1
+                    else:
+                        held.add(outbox_event.outlet_id)
+                        stats.retried += 1
+                    continue
+
+                now = _utcnow()
+                outbox_event.dispatched_at = now
+                stats.delivered += 1
+                stats.lag_seconds = max(
+                    stats.lag_seconds, _age_seconds(outbox_event.created_at, now)
+                )
+            session.commit()
+        return stats
+
+    def backlog(self) -> OutboxBacklog:
+        """Return the number of pending events and the oldest one's age."""
+
+        with self._session_factory() as session:
+            pending, oldest = session.execute(
+                _pending(select(func.count(), func.min(OutboxEvent.created_at)))
+            ).one()
+        age = _age_seconds(oldest, _utcnow()) if oldest is not None else 0.0
+        return OutboxBacklog(pending=pending, oldest_age_seconds=age)
+
+    def _deliver(self, session: Session, message: OutboxMessage) -> None:
+        for handler in self._handlers.get(message.aggregate, ()):
+            handler(session, message)
+
+
+def run_dispatchers(
+    dispatchers: dict[str, OutboxDispatcher], poll_interval: float, once: bool
+) -> None:
+    """Drain every dispatcher, then poll for new events unless ``once``."""
+
+    while True:
+        busy = False
+        for name, dispatcher in dispatchers.items():
+            stats = dispatcher.dispatch_batch()
+            if stats.fetched:
+                backlog = dispatcher.backlog()
+                logger.info(
+                    "Outbox %s: delivered %s, retrying %s, failed %s, "
+                    "lag %.1fs, pending %s (oldest %.1fs)",
+                    name,
+                    stats.delivered,
+                    stats.retried,
+                    stats.failed,
+                    stats.lag_seconds,
+                    backlog.pending,
+                    backlog.oldest_age_seconds,
+                )
+            progressed = stats.delivered + stats.failed > 0
+            busy = busy or (progressed and stats.fetched == dispatcher.batch_size)
+        if not busy:
+            if once:
+                return
+            time.sleep(poll_interval)
+
+
+def main() -> None:
+    """Run the outbox dispatcher for every shard from the command line."""
+
+    import app.db.init_db  # noqa: F401  (registers every mapped model)
+    from app.db.shards import get_shard_router
+    from app.services import outbox_handlers  # noqa: F401  (registers handlers)
+
+    parser = argparse.ArgumentParser(description="Dispatch outbox events.")
+    parser.add_argument("--once", action="store_true", help="exit when drained")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    settings = get_settings()
+    shard_router = get_shard_router()
+    shard_router.create_all()
+    dispatchers = {
+        shard: OutboxDispatcher(
+            session_factory=lambda shard=shard: shard_router.session_for_shard(shard),
+            batch_size=settings.outbox_batch_size,
+            max_attempts=settings.outbox_max_attempts,
+            owned_partners=partial(shard_router.owned_partners, shard),
+        )
+        for shard in shard_router.shard_names()
+    }
+    run_dispatchers(dispatchers, settings.outbox_poll_interval_seconds, args.once)
+
+
+def _pending(stmt):
+    """Restrict a statement to events neither dispatched nor parked."""
+
+    return stmt.where(
+        OutboxEvent.dispatched_at.is_(None), OutboxEvent.failed_at.is_(None)
+    )
+
+
+def _event_row(obj: Any, operation: OutboxOperation, now: datetime) -> dict[str, Any]:
+    """Build an outbox row from an object's loaded column values."""
+
+    state = inspect(obj)
+    values = {
+        attr.key: _json_value(state.dict[attr.key])
+        for attr in state.mapper.column_attrs
+        if attr.key in state.dict
+    }
+    return {
+        "aggregate": obj.__tablename__,
+        "aggregate_id": values.get("id"),
+        "outlet_id": values.get("outlet_id"),
+        "operation": operation,
+        "payload": values,
+        "created_at": now,
+    }
+
+
+def _message(outbox_event: OutboxEvent) -> OutboxMessage:
+    return OutboxMessage(
+        id=outbox_event.id,
+        aggregate=outbox_event.aggregate,
+        aggregate_id=outbox_event.aggregate_id,
+        outlet_id=outbox_event.outlet_id,
+        operation=outbox_event.operation,
+        payload=outbox_event.payload,
+        created_at=outbox_event.created_at,
+    )
+
+
+def _json_value(value: Any) -> Any:
+    """Convert a column value to its JSON representation."""
+
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, enum.Enum):
+        return value.value
+    return value
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _age_seconds(created_at: datetime, now: datetime) -> float:
+    """Return seconds since ``created_at``, treating naive values as UTC."""
+
+    if created_at.tzinfo is None:
+        created_at = created_at.replace(tzinfo=timezone.utc)
+    return (now - created_at).total_seconds()
+
+
+if __name__ == "__main__":
+    main()
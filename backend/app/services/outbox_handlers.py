@@ -0,0 +1,34 @@
+"""Built-in outbox consumers."""
+
+from __future__ import annotations
+
+from datetime import date
+
+from sqlalchemy.orm import Session
+
+from app.models.kpi import KpiDaily
+from app.models.outbox import OutboxOperation
+from app.services.anomaly_detection import generate_ai_tickets
+from app.services.outbox import OutboxMessage, outbox_handler
+from app.services.profit_forecast import refresh_profit_forecasts
+
+
+@outbox_handler(KpiDaily.__tablename__)
+def refresh_outlet_forecast(session: Session, message: OutboxMessage) -> None:
+    """Recompute the month-end forecast of an outlet whose KPIs changed."""
+
+    if message.outlet_id is not None:
+        refresh_profit_forecasts(session, outlet_ids={message.outlet_id}, force=True)
+
+
+@outbox_handler(KpiDaily.__tablename__)
+def reanalyze_outlet(session: Session, message: OutboxMessage) -> None:
+    """Run anomaly detection for an outlet as of the day that changed."""
+
+    if message.outlet_id is None or message.operation is OutboxOperation.deleted:
+        return
+    generate_ai_tickets(
+        session,
+        as_of=date.fromisoformat(message.payload["day"]),
+        outlet_ids={message.outlet_id},
+    )
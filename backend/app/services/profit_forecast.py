@@ -0,0 +1,186 @@
+"""Batch end-of-month profit forecasting."""
+
+from __future__ import annotations
+
+import calendar
+from collections import defaultdict
+from collections.abc import Collection
+from dataclasses import dataclass
+from datetime import date, timedelta
+
+import numpy as np
+from sqlalchemy import delete, func, insert, select, tuple_
+from sqlalchemy.orm import Session
+
+from app.core.config import Settings, get_settings
+from app.models.kpi import KpiDaily
+from app.models.profit_forecast import ProfitForecast
+from app.services.kpi_window import KpiWindow, load_kpi_window
+
+
+@dataclass(frozen=True)
+class ForecastBatch:
+    """Vectorized forecast results for every outlet in a KPI window."""
+
+    outlet_ids: np.ndarray
+    as_of: date
+    revenue_forecast: np.ndarray
+    profit_forecast: np.ndarray
+
+
+def forecast_month_end(window: KpiWindow, settings: Settings) -> ForecastBatch:
+    """Forecast end-of-month revenue and profit as of the window's last day.
+
+    Month-to-date revenue is extended by a deseasonalized run-rate scaled by
+    each outlet's weekday profile for the days left in the month. Profit
+    applies the month-to-date revenue-weighted labor and food cost shares
+    plus a fixed overhead share.
+    """
+
+    as_of = window.end
+    revenue = window.revenue
+    present = ~np.isnan(revenue)
+    filled = np.where(present, revenue, 0.0)
+    weekdays = (window.start.weekday() + np.arange(window.days)) % 7
+
+    seasonality = _weekday_factors(filled, present, weekdays)
+    deseasonalized = filled / seasonality[:, weekdays]
+    recent = slice(max(window.days - settings.forecast_run_rate_days, 0), None)
+    run_rate = _safe_ratio(
+        deseasonalized[:, recent].sum(axis=1), present[:, recent].sum(axis=1)
+    )
+
+    _, month_days = calendar.monthrange(as_of.year, as_of.month)
+    remaining = np.bincount(
+        np.array(
+            [
+                (as_of + timedelta(days=offset)).weekday()
+                for offset in range(1, month_days - as_of.day + 1)
+            ],
+            dtype=np.int64,
+        ),
+        minlength=7,
+    )
+    projected = run_rate * (seasonality @ remaining)
+
+    month = slice(max(window.days - as_of.day, 0), None)
+    month_revenue = filled[:, month].sum(axis=1)
+    cost_percent = np.nan_to_num(
+        window.labor_cost_percent[:, month] + window.food_cost_percent[:, month]
+    )
+    cost_share = _safe_ratio(
+        (filled[:, month] * cost_percent).sum(axis=1), month_revenue * 100
+    )
+
+    revenue_forecast = month_revenue + projected
+    margin = 1 - cost_share - settings.forecast_overhead_percent / 100
+    return ForecastBatch(
+        outlet_ids=window.outlet_ids,
+        as_of=as_of,
+        revenue_forecast=revenue_forecast,
+        profit_forecast=revenue_forecast * margin,
+    )
+
+
+def refresh_profit_forecasts(
+    session: Session,
+    settings: Settings | None = None,
+    force: bool = False,
+    outlet_ids: Collection[int] | None = None,
+) -> int:
+    """Compute and store forecasts for outlets with KPI data newer than theirs.
+
+    Forecasts are memoized per outlet and as-of day, so outlets without new
+    KPI rows keep their stored value and are not rewritten. ``outlet_ids``
+    limits the refresh to the given outlets.
+    """
+
+    settings = settings or get_settings()
+    latest_kpi_stmt = select(KpiDaily.outlet_id, func.max(KpiDaily.day)).group_by(
+        KpiDaily.outlet_id
+    )
+    latest_forecast_stmt = select(
+        ProfitForecast.outlet_id, func.max(ProfitForecast.as_of)
+    ).group_by(ProfitForecast.outlet_id)
+    if outlet_ids is not None:
+        latest_kpi_stmt = latest_kpi_stmt.where(KpiDaily.outlet_id.in_(outlet_ids))
+        latest_forecast_stmt = latest_forecast_stmt.where(
+            ProfitForecast.outlet_id.in_(outlet_ids)
+        )
+    latest_kpi = dict(session.execute(latest_kpi_stmt).all())
+    latest_forecast = dict(session.execute(latest_forecast_stmt).all())
+
+    stale: dict[date, set[int]] = defaultdict(set)
+    for outlet_id, day in latest_kpi.items():
+        known = latest_forecast.get(outlet_id)
+        if force or known is None or known < day:
+            stale[day].add(outlet_id)
+
+    written = 0
+    for as_of, stale_ids in stale.items():
+        days = max(settings.forecast_history_days, as_of.day)
+        window = load_kpi_window(session, as_of, days, outlet_ids=stale_ids)
+        batch = forecast_month_end(window, settings)
+        rows = [
+            {
+                "outlet_id": int(outlet_id),
+                "as_of": as_of,
+                "revenue_forecast": float(revenue),
+                "profit_forecast": float(profit),
+            }
+            for outlet_id, revenue, profit in zip(
+                batch.outlet_ids, batch.revenue_forecast, batch.profit_forecast
+            )
+            if outlet_id in stale_ids
+        ]
+        if not rows:
+            continue
+        if force:
+            session.execute(
+                delete(ProfitForecast).where(
+                    tuple_(ProfitForecast.outlet_id, ProfitForecast.as_of).in_(
+                        [(row["outlet_id"], as_of) for row in rows]
+                    )
+                )
+            )
+        session.execute(insert(ProfitForecast), rows)
+        written += len(rows)
+
+    session.commit()
+    return written
+
+
+def get_profit_forecast(session: Session, outlet_id: int, as_of: date) -> float | None:
+    """Return the stored forecast for an outlet and day, if computed."""
+
+    return session.scalar(
+        select(ProfitForecast.profit_forecast).where(
+            ProfitForecast.outlet_id == outlet_id,
+            ProfitForecast.as_of == as_of,
+        )
+    )
+
+
+def _weekday_factors(
+    filled: np.ndarray, present: np.ndarray, weekdays: np.ndarray
+) -> np.ndarray:
+    """Return per-outlet weekday revenue relative to the outlet's daily mean."""
+
+    overall = _safe_ratio(filled.sum(axis=1), present.sum(axis=1))
+    factors = np.ones((filled.shape[0], 7))
+    for weekday in range(7):
+        columns = weekdays == weekday
+        mean = _safe_ratio(
+            filled[:, columns].sum(axis=1), present[:, columns].sum(axis=1)
+        )
+        known = (mean > 0) & (overall > 0)
+        factors[known, weekday] = mean[known] / overall[known]
+    return factors
+
+
+def _safe_ratio(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    """Divide elementwise, returning zero where the denominator is zero."""
+
+    result = np.zeros(np.broadcast(numerator, denominator).shape)
+    np.divide(numerator, denominator, out=result, where=denominator != 0)
+    return result
@@ -0,0 +1,295 @@
+"""Bulk provisioning of partners, outlets and users.
+
+Usage::
+
+    python -m app.services.provisioning payload.json [--workers N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+from collections import defaultdict
+from collections.abc import Iterable
+from contextlib import ExitStack
+from pathlib import Path
+from typing import Any
+
+from sqlalchemy import select
+from sqlalchemy.orm import InstrumentedAttribute, Session
+
+from app.core.security import hash_passwords
+from app.db.bulk import insert_ignoring_conflicts
+from app.db.shards import DEFAULT_SHARD, PartnerMovingError, ShardRouter
+from app.models.outlet import Outlet
+from app.models.partner import Partner
+from app.models.partner_move import PartnerMove
+from app.models.partner_shard import PartnerShard
+from app.models.user import User
+from app.models.user_directory import UserDirectoryEntry
+from app.schemas.provisioning import ProvisionRequest, ProvisionReport
+from app.services.user_directory import claim_emails, release_emails
+
+logger = logging.getLogger("portal.backend")
+
+_LOOKUP_CHUNK = 1000
+
+
+def provision(
+    shard_router: ShardRouter,
+    request: ProvisionRequest,
+    hash_workers: int | None = None,
+) -> ProvisionReport:
+    """Create the partners, outlets and users of a payload that do not exist.
+
+    Partners are matched by name on the default shard and on the shards the
+    routing table sends moved partners to; missing partners are created on
+    the default shard with one insert that skips names taken concurrently.
+    Outlets and users are written on their partner's shard. Outlets are
+    inserted set-based, skipping external ids already stored there; an
+    external id owned by a partner other than the requested one is reported
+    as a conflict and left untouched. User emails are first claimed in the
+    global user directory, skipping emails taken on any shard, and only
+    claimed users are inserted; claims are released again if their shard
+    write fails. Passwords are hashed in a process pool, and only for emails
+    not found by the upfront lookup. Partners being moved are refused.
+    """
+
+    with ExitStack() as stack:
+        directory = stack.enter_context(shard_router.session_for_shard(DEFAULT_SHARD))
+        routes = dict(
+            directory.execute(
+                select(PartnerShard.partner_id, PartnerShard.shard_name)
+            ).all()
+        )
+        partner_ids, partners_created = _ensure_partners(
+            shard_router,
+            directory,
+            routes,
+            [partner.name for partner in request.partners],
+        )
+        _refuse_moving(directory, list(partner_ids.values()))
+        shards = {
+            partner_id: routes.get(partner_id, DEFAULT_SHARD)
+            for partner_id in partner_ids.values()
+        }
+
+        outlets: dict[str, dict[str, Any]] = {}
+        outlet_owners: list[tuple[str, int]] = []
+        users: dict[str, dict[str, Any]] = {}
+        for partner in request.partners:
+            partner_id = partner_ids[partner.name]
+            for outlet in partner.outlets:
+                outlet_owners.append((outlet.external_id, partner_id))
+                outlets.setdefault(
+                    outlet.external_id,
+                    {
+                        "external_id": outlet.external_id,
+                        "name": outlet.name,
+                        "partner_id": partner_id,
+                    },
+                )
+            for user in partner.users:
+                users.setdefault(
+                    user.email,
+                    {
+                        "email": user.email,
+                        "full_name": user.full_name,
+                        "password": user.password,
+                        "partner_id": partner_id,
+                    },
+                )
+
+        taken = _existing(directory, UserDirectoryEntry.email, users)
+        new_users = [row for email, row in users.items() if email not in taken]
+        passwords = [row.pop("password") for row in new_users]
+        hashes = hash_passwords(passwords, hash_workers)
+        for row, hashed_password in zip(new_users, hashes):
+            row["hashed_password"] = hashed_password
+        claimed = claim_emails(
+            directory, {row["email"]: row["partner_id"] for row in new_users}
+        )
+        directory.commit()
+
+        outlets_by_shard: dict[str, list[dict[str, Any]]] = defaultdict(list)
+        for row in outlets.values():
+            outlets_by_shard[shards[row["partner_id"]]].append(row)
+        users_by_shard: dict[str, list[dict[str, Any]]] = defaultdict(list)
+        for row in new_users:
+            if row["email"] in claimed:
+                users_by_shard[shards[row["partner_id"]]].append(row)
+
+        outlets_created = 0
+        users_created = 0
+        owners: dict[str, int] = {}
+        for shard in sorted({*outlets_by_shard, *users_by_shard}):
+            session = directory
+            if shard != DEFAULT_SHARD:
+                session = stack.enter_context(shard_router.session_for_shard(shard))
+            shard_outlets = outlets_by_shard[shard]
+            shard_users = users_by_shard[shard]
+            try:
+                outlets_created += len(
+                    insert_ignoring_conflicts(
+                        session, Outlet.__table__, shard_outlets, "external_id"
+                    )
+                )
+                owners.update(
+                    _outlet_owners(
+                        session, [row["external_id"] for row in shard_outlets]
+                    )
+                )
+                inserted = set(
+                    insert_ignoring_conflicts(
+                        session, User.__table__, shard_users, "email"
+                    )
+                )
+                session.commit()
+            except BaseException:
+                session.rollback()
+                _release(directory, [row["email"] for row in shard_users])
+                raise
+            _release(
+                directory,
+                [row["email"] for row in shard_users if row["email"] not in inserted],
+            )
+            users_created += len(inserted)
+
+    requested_users = sum(len(partner.users) for partner in request.partners)
+    return ProvisionReport(
+        partners_created=partners_created,
+        outlets_created=outlets_created,
+        outlets_skipped=len(outlet_owners) - outlets_created,
+        outlet_conflicts=sorted(
+            {
+                external_id
+                for external_id, partner_id in outlet_owners
+                if owners.get(external_id) != partner_id
+            }
+        ),
+        users_created=users_created,
+        users_skipped=requested_users - users_created,
+    )
+
+
+def _ensure_partners(
+    shard_router: ShardRouter,
+    directory: Session,
+    routes: dict[int, str],
+    names: list[str],
+) -> tuple[dict[str, int], int]:
+    """Return partner ids by name, creating the missing partners.
+
+    Moved partners are looked up on the shard their route points to, so a
+    name moved off the default shard is not created there again.
+    """
+
+    wanted = list(dict.fromkeys(names))
+    partner_ids = _partners_by_name(directory, wanted)
+    for shard in sorted(set(routes.values()) - {DEFAULT_SHARD}):
+        remaining = [name for name in wanted if name not in partner_ids]
+        if not remaining:
+            break
+        with shard_router.session_for_shard(shard) as session:
+            found = _partners_by_name(session, remaining)
+        partner_ids.update(
+            (name, partner_id)
+            for name, partner_id in found.items()
+            if routes.get(partner_id) == shard
+        )
+
+    missing = [name for name in wanted if name not in partner_ids]
+    created = insert_ignoring_conflicts(
+        directory, Partner.__table__, [{"name": name} for name in missing], "name"
+    )
+    if missing:
+        partner_ids.update(_partners_by_name(directory, missing))
+    return partner_ids, len(created)
+
+
+def _partners_by_name(session: Session, names: list[str]) -> dict[str, int]:
+    """Return the ids of the partners stored under ``names`` on a shard."""
+
+    partner_ids: dict[str, int] = {}
+    for chunk in _chunks(names):
+        partner_ids.update(
+            (name, partner_id)
+            for partner_id, name in session.execute(
+                select(Partner.id, Partner.name).where(Partner.name.in_(chunk))
+            )
+        )
+    return partner_ids
+
+
+def _refuse_moving(directory: Session, partner_ids: list[int]) -> None:
+    """Raise ``PartnerMovingError`` if any of the partners is being moved."""
+
+    for chunk in _chunks(partner_ids):
+        moving = directory.scalar(
+            select(PartnerMove.partner_id).where(PartnerMove.partner_id.in_(chunk))
+        )
+        if moving is not None:
+            raise PartnerMovingError(moving)
+
+
+def _outlet_owners(session: Session, external_ids: list[str]) -> dict[str, int]:
+    """Return the partner id owning each stored outlet external id."""
+
+    owners: dict[str, int] = {}
+    for chunk in _chunks(external_ids):
+        owners.update(
+            session.execute(
+                select(Outlet.external_id, Outlet.partner_id).where(
+                    Outlet.external_id.in_(chunk)
+                )
+            ).all()
+        )
+    return owners
+
+
+def _existing(
+    session: Session, column: InstrumentedAttribute, values: Iterable[str]
+) -> set[str]:
+    """Return which of ``values`` are already stored in ``column``."""
+
+    found: set[str] = set()
+    for chunk in _chunks(list(values)):
+        found.update(session.scalars(select(column).where(column.in_(chunk))))
+    return found
+
+
+def _release(directory: Session, emails: list[str]) -> None:
+    """Release directory claims for users that were not written."""
+
+    if emails:
+        release_emails(directory, emails)
+        directory.commit()
+
+
+def _chunks(values: list[Any]) -> Iterable[list[Any]]:
+    for index in range(0, len(values), _LOOKUP_CHUNK):
+        yield values[index : index + _LOOKUP_CHUNK]
+
+
+def main() -> None:
+    """Provision accounts from a JSON payload file."""
+
+    import app.db.init_db  # noqa: F401  (registers every mapped model)
+    from app.db.shards import get_shard_router
+
+    parser = argparse.ArgumentParser(description="Provision accounts in bulk.")
+    parser.add_argument("payload", type=Path, help="JSON file with a partners list")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    request = ProvisionRequest.model_validate(json.loads(args.payload.read_text()))
+    shard_router = get_shard_router()
+    shard_router.create_all()
+    report = provision(shard_router, request, hash_workers=args.workers)
+    logger.info("Provisioned: %s", report.model_dump())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""Ranked, keyset-paginated AI ticket search."""
+
+from __future__ import annotations
+
+import base64
+import enum
+import json
+import re
+from dataclasses import dataclass
+
+from sqlalchemy import (
+    ColumnElement,
+    Double,
+    cast,
+    column,
+    func,
+    literal,
+    literal_column,
+    select,
+    table,
+    tuple_,
+)
+from sqlalchemy.orm import Session
+
+from app.db.search import TRIGRAM_DOCUMENT, TS_CONFIG, has_trigram_index
+from app.models.ai_ticket import AiTicket
+from app.models.outlet import Outlet
+
+_WORD = re.compile(r"\w+")
+_FTS = table("ai_tickets_fts", column("rowid"))
+
+
+class SearchMode(str, enum.Enum):
+    """How a search matched tickets."""
+
+    fulltext = "fulltext"
+    fuzzy = "fuzzy"
+
+
+@dataclass(frozen=True)
+class SearchCursor:
+    """Position after the last hit of a page: mode, rank and ticket id."""
+
+    mode: SearchMode
+    rank: float
+    id: int
+
+    def encode(self) -> str:
+        """Return an opaque URL-safe token."""
+
+        raw = json.dumps([self.mode.value, self.rank, self.id]).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+    @classmethod
+    def decode(cls, token: str) -> SearchCursor:
+        """Parse a token from ``encode``, raising ValueError when malformed."""
+
+        try:
+            raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+            mode, rank, ticket_id = json.loads(raw)
+            return cls(SearchMode(mode), float(rank), int(ticket_id))
+        except (TypeError, ValueError) as exc:
+            raise ValueError("Malformed search cursor") from exc
+
+
+@dataclass(frozen=True)
+class SearchHit:
+    """A matching ticket with its relevance, higher first."""
+
+    ticket: AiTicket
+    rank: float
+
+
+@dataclass(frozen=True)
+class SearchPage:
+    """One page of hits and the cursor of the next page, if any."""
+
+    hits: list[SearchHit]
+    mode: SearchMode
+    next_cursor: SearchCursor | None
+
+
+def search_tickets(
+    session: Session,
+    partner_id: int,
+    query: str,
+    limit: int,
+    cursor: SearchCursor | None = None,
+) -> SearchPage:
+    """Search the partner's tickets by title and body.
+
+    Full-text matches come first; when a query has none, PostgreSQL falls
+    back to trigram word similarity so misspelled words still match. Pages
+    are ordered by rank and id and continue from ``cursor`` without OFFSET.
+    """
+
+    mode = cursor.mode if cursor is not None else SearchMode.fulltext
+    rows = _page(session, partner_id, query, limit, mode, cursor)
+    if not rows and cursor is None and has_trigram_index(session.connection()):
+        mode = SearchMode.fuzzy
+        rows = _page(session, partner_id, query, limit, mode, cursor)
+
+    hits = [SearchHit(ticket=ticket, rank=rank) for ticket, rank in rows[:limit]]
+    next_cursor = None
+    if len(rows) > limit:
+        last = hits[-1]
+        next_cursor = SearchCursor(mode=mode, rank=last.rank, id=last.ticket.id)
+    return SearchPage(hits=hits, mode=mode, next_cursor=next_cursor)
+
+
+def _page(
+    session: Session,
+    partner_id: int,
+    query: str,
+    limit: int,
+    mode: SearchMode,
+    cursor: SearchCursor | None,
+) -> list[tuple[AiTicket, float]]:
+    """Fetch one page plus one extra row to detect a following page."""
+
+    dialect = session.get_bind().dialect.name
+    if dialect == "postgresql":
+        rank, matched = _postgres_match(query, mode)
+        stmt = select(AiTicket, rank).where(matched)
+    elif dialect == "sqlite" and mode is SearchMode.fulltext:
+        match = _fts_query(query)
+        if match is None:
+            return []
+        rank = -literal_column("bm25(ai_tickets_fts, 2.0, 1.0)")
+        stmt = (
+            select(AiTicket, rank)
+            .join(_FTS, _FTS.c.rowid == AiTicket.id)
+            .where(literal_column("ai_tickets_fts").op("MATCH")(match))
+        )
+    else:
+        return []
+
+    stmt = stmt.join(Outlet, Outlet.id == AiTicket.outlet_id).where(
+        Outlet.partner_id == partner_id
+    )
+    if cursor is not None:
+        stmt = stmt.where(
+            tuple_(rank, AiTicket.id) < tuple_(literal(cursor.rank), literal(cursor.id))
+        )
+    stmt = stmt.order_by(rank.desc(), AiTicket.id.desc()).limit(limit + 1)
+    return [(ticket, float(score)) for ticket, score in session.execute(stmt)]
+
+
+def _postgres_match(
+    query: str, mode: SearchMode
+) -> tuple[ColumnElement[float], ColumnElement[bool]]:
+    """Return the rank expression and match condition for PostgreSQL.
+
+    Ranks are ``real``; they are cast to double precision so the value sent
+    back in a cursor compares equal to the one computed for the next page.
+    """
+
+    if mode is SearchMode.fuzzy:
+        document = literal_column(TRIGRAM_DOCUMENT)
+        return (
+            cast(func.word_similarity(query, document), Double),
+            literal(query).op("<%")(document),
+        )
+    vector = literal_column("ai_tickets.search_vector")
+    tsquery = func.websearch_to_tsquery(
+        literal_column(f"'{TS_CONFIG}'::regconfig"), query
+    )
+    return cast(func.ts_rank_cd(vector, tsquery), Double), vector.op("@@")(tsquery)
+
+
+def _fts_query(query: str) -> str | None:
+    """Build an FTS5 query matching every word of ``query`` as a prefix."""
+
+    words = _WORD.findall(query)
+    if not words:
+        return None
+    return " ".join(f'"{word}"*' for word in words)
@@ -0,0 +1,71 @@
+"""Global email directory used to keep user emails unique across shards.
+
+Entries live in the default database; sessions passed here must be open on
+the default shard.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from app.db.bulk import insert_ignoring_conflicts
+from app.db.shards import DEFAULT_SHARD, ShardRouter
+from app.models.user import User
+from app.models.user_directory import UserDirectoryEntry
+
+_BACKFILL_CHUNK = 1000
+
+
+def claim_emails(session: Session, partners: dict[str, int]) -> set[str]:
+    """Record emails for their partners, returning those not taken before.
+
+    The caller commits.
+    """
+
+    rows = [
+        {"email": email, "partner_id": partner_id}
+        for email, partner_id in partners.items()
+    ]
+    return set(
+        insert_ignoring_conflicts(session, UserDirectoryEntry.__table__, rows, "email")
+    )
+
+
+def release_emails(session: Session, emails: Iterable[str]) -> None:
+    """Remove emails from the directory. The caller commits."""
+
+    session.execute(
+        delete(UserDirectoryEntry).where(UserDirectoryEntry.email.in_(list(emails)))
+    )
+
+
+def partner_for_email(session: Session, email: str) -> int | None:
+    """Return the partner of the user registered with ``email``, if any."""
+
+    return session.scalar(
+        select(UserDirectoryEntry.partner_id).where(UserDirectoryEntry.email == email)
+    )
+
+
+def backfill_user_directory(shard_router: ShardRouter) -> int:
+    """Add users of every shard that are missing from the directory.
+
+    When shards already disagree on an email, the default shard and then
+    the first configured shard wins. Returns the number of entries added.
+    """
+
+    added = 0
+    with shard_router.session_for_shard(DEFAULT_SHARD) as directory:
+        for shard in shard_router.shard_names():
+            with shard_router.session_for_shard(shard) as session:
+                users = session.execute(
+                    select(User.email, User.partner_id).order_by(User.id)
+                ).all()
+            for index in range(0, len(users), _BACKFILL_CHUNK):
+                chunk = users[index : index + _BACKFILL_CHUNK]
+                added += len(claim_emails(directory, dict(chunk)))
+            directory.commit()
+    return added
@@ -0,0 +1,139 @@
+"""Benchmark KPI anomaly detection across a large outlet network.
+
+Seeds ``KpiDaily`` rows into a database, then times loading the per-outlet
+snapshot with ``load_kpi_snapshot`` and running ``detect_anomalies`` on it.
+
+Run from the ``backend`` directory::
+
+    python -m benchmarks.bench_anomaly_detection --outlets 10000 --days 90
+    python -m benchmarks.bench_anomaly_detection --database-url postgresql://...
+
+Without ``--database-url`` a temporary SQLite database is used. The
+PostgreSQL database must be empty; its tables are created by the benchmark.
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+import numpy as np
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+import app.db.init_db  # noqa: F401  (registers every mapped model)
+from app.core.config import get_settings
+from app.models.base import Base
+from app.models.kpi import KpiDaily
+from app.models.outlet import Outlet
+from app.models.partner import Partner
+from app.services.anomaly_detection import detect_anomalies
+from app.services.kpi_window import load_kpi_snapshot
+
+_BATCH = 50000
+
+
+def _seed(
+    session_factory: sessionmaker, outlets: int, days: int, as_of: date, seed: int
+) -> int:
+    """Insert one partner, its outlets and their KPI history; return row count."""
+
+    rng = np.random.default_rng(seed)
+    start = as_of - timedelta(days=days - 1)
+    outlet_ids = np.repeat(np.arange(1, outlets + 1), days)
+    offsets = np.tile(np.arange(days), outlets)
+    keep = rng.random(outlet_ids.size) > 0.02
+    outlet_ids, offsets = outlet_ids[keep], offsets[keep]
+    size = outlet_ids.size
+    values = {
+        "revenue": rng.normal(100000, 12000, size),
+        "checks": rng.normal(90, 10, size).round(),
+        "plan_percent": rng.normal(97, 6, size),
+        "labor_cost_percent": rng.normal(28, 2.5, size),
+        "food_cost_percent": rng.normal(27, 2.5, size),
+    }
+
+    with session_factory() as session:
+        session.execute(insert(Partner), [{"id": 1, "name": "Bench"}])
+        session.execute(
+            insert(Outlet),
+            [
+                {"id": index, "name": f"Точка {index}", "partner_id": 1}
+                for index in range(1, outlets + 1)
+            ],
+        )
+        for begin in range(0, size, _BATCH):
+            session.execute(
+                insert(KpiDaily),
+                [
+                    {
+                        "outlet_id": int(outlet_ids[index]),
+                        "day": start + timedelta(days=int(offsets[index])),
+                        "revenue": float(values["revenue"][index]),
+                        "checks": int(values["checks"][index]),
+                        "plan_percent": float(values["plan_percent"][index]),
+                        "labor_cost_percent": float(
+                            values["labor_cost_percent"][index]
+                        ),
+                        "food_cost_percent": float(values["food_cost_percent"][index]),
+                        "profit_forecast": 0.0,
+                        "lfl_percent": 0.0,
+                    }
+                    for index in range(begin, min(begin + _BATCH, size))
+                ],
+            )
+        session.commit()
+    return size
+
+
+def main() -> None:
+    """Run the benchmark and print timings."""
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--outlets", type=int, default=10000)
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--database-url", default=None)
+    args = parser.parse_args()
+
+    settings = get_settings()
+    as_of = date.today()
+    with tempfile.TemporaryDirectory() as workdir:
+        url = args.database_url or f"sqlite:///{Path(workdir) / 'kpis.db'}"
+        engine = create_engine(url)
+        Base.metadata.create_all(engine)
+        session_factory = sessionmaker(bind=engine)
+        rows = _seed(session_factory, args.outlets, args.days, as_of, args.seed)
+        print(
+            f"{engine.dialect.name}: {rows:,} rows "
+            f"({args.outlets:,} outlets x {args.days} days)"
+        )
+
+        load_times: list[float] = []
+        detect_times: list[float] = []
+        anomalies = []
+        with session_factory() as session:
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                snapshot = load_kpi_snapshot(session, as_of, args.days)
+                loaded = time.perf_counter()
+                anomalies = detect_anomalies(snapshot, settings)
+                finished = time.perf_counter()
+                load_times.append(loaded - started)
+                detect_times.append(finished - loaded)
+                session.rollback()
+        engine.dispose()
+
+    print(f"anomalies: {len(anomalies):,}")
+    print(f"load snapshot: best {min(load_times) * 1000:.1f} ms")
+    print(f"detect:        best {min(detect_times) * 1000:.1f} ms")
+    total = min(load + detect for load, detect in zip(load_times, detect_times))
+    print(f"total:         best {total * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""Benchmark response compression: bytes saved versus CPU per endpoint.
+
+Renders dashboard-shaped payloads (ticket lists with Russian text, chart
+series, KPI summary), compresses them with every supported encoding at the
+size-selected level and reports the cost of a cache miss versus a
+precompressed cache hit.
+
+Run from the ``backend`` directory::
+
+    python -m benchmarks.bench_compression --tickets 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import time
+from collections.abc import Callable
+from datetime import date, timedelta
+from typing import Any
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from starlette.requests import Request
+
+from app.core.compression import compress, supported_encodings
+from app.core.response_cache import cached_json_response, get_response_cache
+from app.models.ai_ticket import AiTicketSeverity, AiTicketStatus
+from app.schemas.dashboard import AiTicketRead, KpiSummary, WeeklyChartPoint
+
+_PHRASES = (
+    "ФОТ превышен на {n}%. Вчера вышло {m} поваров при выручке {r} ₽.",
+    "Продажи сезонного чая упали на {n}%. Конкуренты включили промо.",
+    "Фудкост {n}% при норме 30%. Перерасход {r} ₽.",
+    "Выручка на {n}% ниже средней. Проверьте график смен и акции.",
+)
+
+
+def _payloads(tickets: int, days: int) -> dict[str, Any]:
+    """Build representative payloads for the cached dashboard endpoints."""
+
+    rng = random.Random(7)
+    today = date.today()
+    return {
+        "/dashboard/ai-tickets": [
+            AiTicketRead(
+                id=index,
+                severity=rng.choice(list(AiTicketSeverity)),
+                status=AiTicketStatus.open,
+                title=rng.choice(["ФОТ превышен", "Падение выручки", "Фудкост"]),
+                body=" ".join(
+                    rng.choice(_PHRASES).format(
+                        n=rng.randint(5, 40),
+                        m=rng.randint(2, 9),
+                        r=rng.randint(1000, 90000),
+                    )
+                    for _ in range(3)
+                ),
+                action_label="Исправить график",
+            )
+            for index in range(tickets, 0, -1)
+        ],
+        "/charts/weekly": [
+            WeeklyChartPoint(
+                day=today - timedelta(days=offset),
+                revenue=rng.uniform(80000, 130000),
+                checks=rng.randint(60, 120),
+            )
+            for offset in range(days)
+        ],
+        "/dashboard/kpis": KpiSummary(
+            revenue_today=90000,
+            revenue_plan_percent=92,
+            labor_cost_percent=32,
+            food_cost_percent=28.5,
+            profit_forecast=594000,
+            lfl_percent=4.2,
+        ),
+    }
+
+
+def _median_us(action: Callable[[], Any], repeat: int) -> float:
+    """Return the median wall time of ``action`` in microseconds."""
+
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        action()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1e6
+
+
+def _request(encoding: str) -> Request:
+    """Build a bare request carrying an Accept-Encoding header."""
+
+    return Request(
+        {
+            "type": "http",
+            "method": "GET",
+            "path": "/",
+            "headers": [(b"accept-encoding", encoding.encode())],
+        }
+    )
+
+
+def main() -> None:
+    """Run the benchmark and print one row per endpoint and encoding."""
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tickets", type=int, default=200)
+    parser.add_argument("--days", type=int, default=7)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"{'endpoint':<24}{'enc':>5}{'raw B':>10}{'sent B':>10}{'saved':>8}"
+          f"{'compress us':>13}{'miss us':>10}{'hit us':>9}")
+    for path, payload in _payloads(args.tickets, args.days).items():
+        body = JSONResponse(content=jsonable_encoder(payload)).body
+        for encoding in supported_encodings():
+            compressed = compress(body, encoding)
+            cost = _median_us(lambda: compress(body, encoding), args.repeat)
+            request = _request(encoding)
+
+            def miss() -> None:
+                get_response_cache.cache_clear()
+                cached_json_response(request, path, lambda: payload)
+
+            miss_us = _median_us(miss, args.repeat)
+            hit_us = _median_us(
+                lambda: cached_json_response(request, path, lambda: payload),
+                args.repeat,
+            )
+            saved = 1 - len(compressed) / len(body)
+            print(
+                f"{path:<24}{encoding:>5}{len(body):>10}{len(compressed):>10}"
+                f"{saved:>8.0%}{cost:>13.1f}{miss_us:>10.1f}{hit_us:>9.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""Benchmark the columnar KPI store against direct chart queries.
+
+Seeds a temporary SQLite database, then reports array memory per outlet,
+cold hydration time and warm slice latency next to the equivalent
+``KpiDaily`` query.
+
+Run from the ``backend`` directory::
+
+    python -m benchmarks.bench_kpi_store --outlets 200 --days 365
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+from sqlalchemy import create_engine, desc, insert, select
+from sqlalchemy.orm import sessionmaker
+
+import app.db.init_db  # noqa: F401  (registers every mapped model)
+from app.models.base import Base
+from app.models.kpi import KpiDaily
+from app.models.outlet import Outlet
+from app.models.partner import Partner
+from app.services.kpi_store import KpiSeriesStore
+
+
+def _seed(session_factory: sessionmaker, outlets: int, days: int) -> date:
+    """Insert ``days`` of KPI rows for every outlet and return the last day."""
+
+    end = date.today()
+    with session_factory() as session:
+        session.execute(insert(Partner), [{"id": 1, "name": "Bench"}])
+        session.execute(
+            insert(Outlet),
+            [
+                {"id": index, "name": f"Outlet {index}", "partner_id": 1}
+                for index in range(1, outlets + 1)
+            ],
+        )
+        for outlet_id in range(1, outlets + 1):
+            session.execute(
+                insert(KpiDaily),
+                [
+                    {
+                        "outlet_id": outlet_id,
+                        "day": end - timedelta(days=offset),
+                        "revenue": 90000.0 + offset,
+                        "plan_percent": 95.0,
+                        "labor_cost_percent": 31.5,
+                        "food_cost_percent": 28.0,
+                        "profit_forecast": 0.0,
+                        "checks": 80 + offset % 40,
+                        "lfl_percent": 2.0,
+                    }
+                    for offset in range(days)
+                ],
+            )
+        session.commit()
+    return end
+
+
+def _timed(action, repeat: int) -> float:
+    """Return the median wall time of ``action`` in microseconds."""
+
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        action()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1e6
+
+
+def main() -> None:
+    """Run the benchmark and print memory and latency figures."""
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--outlets", type=int, default=200)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(f"sqlite:///{Path(directory) / 'bench.db'}")
+        Base.metadata.create_all(engine)
+        session_factory = sessionmaker(bind=engine)
+        end = _seed(session_factory, args.outlets, args.days)
+        store = KpiSeriesStore(max_bytes=1 << 30, ttl_seconds=3600)
+        start = end - timedelta(days=29)
+
+        with session_factory() as session:
+            hydrate = _timed(
+                lambda: store.get(session, random.randint(1, args.outlets)),
+                args.repeat,
+            )
+            for outlet_id in range(1, args.outlets + 1):
+                store.get(session, outlet_id)
+
+            def pick() -> int:
+                return random.randint(1, args.outlets)
+
+            store_tail = _timed(lambda: store.get(session, pick()).tail(7), args.repeat)
+            store_range = _timed(
+                lambda: store.get(session, pick()).between(start, end), args.repeat
+            )
+            db_tail = _timed(
+                lambda: session.execute(
+                    select(KpiDaily.day, KpiDaily.revenue, KpiDaily.checks)
+                    .where(KpiDaily.outlet_id == pick())
+                    .order_by(desc(KpiDaily.day))
+                    .limit(7)
+                ).all(),
+                args.repeat,
+            )
+            db_range = _timed(
+                lambda: session.execute(
+                    select(KpiDaily.day, KpiDaily.revenue, KpiDaily.checks).where(
+                        KpiDaily.outlet_id == pick(),
+                        KpiDaily.day >= start,
+                        KpiDaily.day <= end,
+                    )
+                ).all(),
+                args.repeat,
+            )
+        engine.dispose()
+
+    print(f"outlets: {len(store)}, days per outlet: {args.days}")
+    print(
+        f"store memory: {store.nbytes / 1024:.1f} KiB total, "
+        f"{store.nbytes / len(store):.0f} B per outlet"
+    )
+    print(f"hydrate one outlet:   {hydrate:9.1f} us")
+    print(f"last 7 days  store:   {store_tail:9.1f} us   db: {db_tail:9.1f} us")
+    print(f"30-day range store:   {store_range:9.1f} us   db: {db_range:9.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""Benchmark bulk provisioning throughput.
+
+Provisions partners, outlets and users into fresh temporary SQLite
+databases, once with serial password hashing and once with the process
+pool, then re-runs the pooled payload to show the cost of an idempotent
+replay where every email already exists.
+
+Run from the ``backend`` directory::
+
+    python -m benchmarks.bench_provisioning --users 10000 --bcrypt-rounds 4
+
+``--bcrypt-rounds`` lowers the bcrypt cost for quick runs; omit it to
+measure the production setting.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+import time
+from pathlib import Path
+
+
+def _payload(partners: int, outlets: int, users: int):
+    """Build a provisioning request spreading users across partners."""
+
+    from app.schemas.provisioning import ProvisionRequest
+
+    return ProvisionRequest.model_validate(
+        {
+            "partners": [
+                {
+                    "name": f"Партнер {partner}",
+                    "outlets": [
+                        {"external_id": f"P{partner}-{index}", "name": f"Точка {index}"}
+                        for index in range(outlets)
+                    ],
+                    "users": [
+                        {
+                            "email": f"user{index}@partner{partner}.example.com",
+                            "full_name": f"Сотрудник {index}",
+                            "password": f"secret-{index}",
+                        }
+                        for index in range(partner, users, partners)
+                    ],
+                }
+                for partner in range(partners)
+            ]
+        }
+    )
+
+
+def _run(label: str, shard_router, request, workers: int) -> None:
+    """Provision the payload and print timing and throughput."""
+
+    from app.services.provisioning import provision
+
+    started = time.perf_counter()
+    report = provision(shard_router, request, hash_workers=workers)
+    elapsed = time.perf_counter() - started
+    requested = report.users_created + report.users_skipped
+    print(
+        f"{label:<22}{workers:>8}{report.users_created:>9}{report.users_skipped:>9}"
+        f"{elapsed:>10.2f}{requested / elapsed:>12.0f}"
+    )
+
+
+def main() -> None:
+    """Run the benchmark and print one row per provisioning run."""
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=10000)
+    parser.add_argument("--partners", type=int, default=20)
+    parser.add_argument("--outlets", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--bcrypt-rounds", type=int, default=None)
+    args = parser.parse_args()
+
+    if args.bcrypt_rounds is not None:
+        # Set before the app is imported; spawned hashing workers inherit it.
+        os.environ["PASSWORD_BCRYPT_ROUNDS"] = str(args.bcrypt_rounds)
+
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+
+    import app.db.init_db  # noqa: F401  (registers every mapped model)
+    from app.core.config import get_settings
+    from app.db.shards import ShardRouter
+    from app.models.base import Base
+
+    request = _payload(args.partners, args.outlets, args.users)
+    print(f"bcrypt rounds: {get_settings().password_bcrypt_rounds}")
+    print(
+        f"{'run':<22}{'workers':>8}{'created':>9}{'skipped':>9}"
+        f"{'seconds':>10}{'users/s':>12}"
+    )
+    with tempfile.TemporaryDirectory() as workdir:
+        for label, workers in (("serial hashing", 1), ("process pool", args.workers)):
+            engine = create_engine(f"sqlite:///{Path(workdir) / f'{workers}.db'}")
+            Base.metadata.create_all(engine)
+            shard_router = ShardRouter(
+                shard_urls={},
+                default_engine=engine,
+                default_sessionmaker=sessionmaker(bind=engine),
+                route_ttl_seconds=0,
+            )
+            _run(label, shard_router, request, workers)
+            if workers == args.workers:
+                _run("replay (all existing)", shard_router, request, workers)
+            engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""Benchmark API throughput against the number of server workers.
+
+Starts ``python -m app.server`` on a temporary SQLite database for each
+worker count and drives ``/auth/login`` (bcrypt-bound) and ``/health``
+from a pool of client threads.
+
+Run from the ``backend`` directory::
+
+    python -m benchmarks.bench_server_workers --workers 1 2 4
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import httpx
+
+
+def _wait_ready(base_url: str, timeout: float = 30.0) -> None:
+    """Block until the health endpoint answers."""
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"{base_url}/health", timeout=1.0).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError("Server did not become ready")
+
+
+def _drive(
+    base_url: str, path: str, clients: int, duration: float
+) -> tuple[float, int]:
+    """Send requests from ``clients`` threads for ``duration`` seconds.
+
+    Returns completed requests per second and the number of connections
+    reset, which happen when a worker is recycled after ``max_requests``.
+    """
+
+    def worker() -> tuple[int, int]:
+        done = errors = 0
+        deadline = time.monotonic() + duration
+        with httpx.Client(base_url=base_url, timeout=30.0) as client:
+            while time.monotonic() < deadline:
+                try:
+                    if path == "/auth/login":
+                        client.post(
+                            path,
+                            data={
+                                "username": "demo@portal.app",
+                                "password": "demo1234",
+                            },
+                        )
+                    else:
+                        client.get(path)
+                except httpx.TransportError:
+                    errors += 1
+                    continue
+                done += 1
+        return done, errors
+
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        results = list(pool.map(lambda _: worker(), range(clients)))
+    return (
+        sum(done for done, _ in results) / duration,
+        sum(errors for _, errors in results),
+    )
+
+
+def main() -> None:
+    """Run the benchmark for each worker count and print requests per second."""
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    print(f"cpu count: {os.cpu_count()}")
+    with tempfile.TemporaryDirectory() as directory:
+        env = {
+            **os.environ,
+            "DATABASE_URL": f"sqlite:///{Path(directory) / 'bench.db'}",
+            "PORT": str(args.port),
+        }
+        base_url = f"http://127.0.0.1:{args.port}"
+        for workers in args.workers:
+            server = subprocess.Popen(
+                [sys.executable, "-m", "app.server"],
+                env={**env, "WEB_CONCURRENCY": str(workers)},
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+            try:
+                _wait_ready(base_url)
+                for path in ("/health", "/auth/login"):
+                    rate, resets = _drive(base_url, path, args.clients, args.duration)
+                    print(
+                        f"workers={workers:<3} {path:<12} {rate:10.1f} req/s "
+                        f"({resets} resets)"
+                    )
+            finally:
+                server.terminate()
+                server.wait(timeout=60)
+
+
+if __name__ == "__main__":
+    main()
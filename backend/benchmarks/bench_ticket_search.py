@@ -0,0 +1,183 @@
+"""Benchmark ranked AI ticket search on a large ticket table.
+
+Seeds AI tickets with Russian titles and bodies, installs the search
+structures for the database dialect and reports first-page and deep-page
+latency per query next to an ``ILIKE`` scan of the same table.
+
+Run from the ``backend`` directory::
+
+    python -m benchmarks.bench_ticket_search --tickets 1000000
+    python -m benchmarks.bench_ticket_search --database-url postgresql+psycopg2://...
+
+Without ``--database-url`` a temporary SQLite database (FTS5) is used. The
+PostgreSQL database must be empty; its tables are created by the benchmark.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import tempfile
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+from sqlalchemy import create_engine, desc, insert, or_, select, text
+from sqlalchemy.orm import sessionmaker
+
+import app.db.init_db  # noqa: F401  (registers every mapped model)
+from app.db.search import install_ticket_search
+from app.models.ai_ticket import AiTicket, AiTicketSeverity, AiTicketStatus
+from app.models.base import Base
+from app.models.outlet import Outlet
+from app.models.partner import Partner
+from app.services.ticket_search import search_tickets
+
+_TITLES = (
+    "ФОТ превышен",
+    "Фудкост превышен",
+    "Падение выручки",
+    "Отставание от плана",
+    "Продажи сезонного чая",
+)
+_SENTENCES = (
+    "ФОТ превышен на {n}%. Вчера вышло {m} поваров при выручке {r} ₽.",
+    "Фудкост {n}% при норме 30%. Перерасход {r} ₽.",
+    "Выручка на {n}% ниже средней. Проверьте график смен.",
+    "Продажи сезонного чая упали на {n}%. Конкуренты включили промо.",
+    "Запустите акцию выходного дня, чтобы вернуть {m} чеков в час.",
+    "План выполнен на {n}%. Недобор {r} ₽.",
+)
+_RARE = "Проверьте списания молочной продукции у поставщика {m}."
+_QUERIES = (
+    ("common word", "ФОТ"),
+    ("two words", "сезонного чая"),
+    ("rare word", "списания"),
+    ("misspelled", "паставщика"),
+)
+_BATCH = 20000
+
+
+def _seed(session_factory: sessionmaker, tickets: int, outlets: int) -> None:
+    """Insert one partner, its outlets and ``tickets`` AI tickets."""
+
+    rng = random.Random(11)
+    with session_factory() as session:
+        session.execute(insert(Partner), [{"id": 1, "name": "Bench"}])
+        session.execute(
+            insert(Outlet),
+            [
+                {"id": index, "name": f"Точка {index}", "partner_id": 1}
+                for index in range(1, outlets + 1)
+            ],
+        )
+        for start in range(0, tickets, _BATCH):
+            rows = []
+            for _ in range(min(_BATCH, tickets - start)):
+                sentences = rng.sample(_SENTENCES, 2)
+                if rng.random() < 0.001:
+                    sentences.append(_RARE)
+                values = {
+                    "n": rng.randint(5, 40),
+                    "m": rng.randint(2, 90),
+                    "r": rng.randint(1000, 90000),
+                }
+                rows.append(
+                    {
+                        "outlet_id": rng.randint(1, outlets),
+                        "severity": rng.choice(list(AiTicketSeverity)),
+                        "status": rng.choice(list(AiTicketStatus)),
+                        "title": rng.choice(_TITLES),
+                        "body": " ".join(s.format(**values) for s in sentences),
+                        "action_label": "Открыть отчет",
+                    }
+                )
+            session.execute(insert(AiTicket), rows)
+            session.commit()
+
+
+def _timed(action: Callable[[], object], repeat: int) -> tuple[float, float]:
+    """Return the median and 95th percentile wall time in milliseconds."""
+
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        action()
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return statistics.median(samples), samples[int(0.95 * (len(samples) - 1))]
+
+
+def main() -> None:
+    """Run the benchmark and print latency per query."""
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tickets", type=int, default=1_000_000)
+    parser.add_argument("--outlets", type=int, default=500)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--pages", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--database-url", default=None)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        url = args.database_url or f"sqlite:///{Path(workdir) / 'search.db'}"
+        engine = create_engine(url)
+        Base.metadata.create_all(engine)
+        install_ticket_search(engine)
+        session_factory = sessionmaker(bind=engine)
+
+        started = time.perf_counter()
+        _seed(session_factory, args.tickets, args.outlets)
+        with engine.begin() as connection:
+            connection.execute(text("ANALYZE"))
+        print(
+            f"{engine.dialect.name}: seeded {args.tickets} tickets "
+            f"in {time.perf_counter() - started:.1f}s"
+        )
+
+        print(
+            f"{'query':<14}{'mode':>10}{'hits':>6}{'page 1 p50':>12}{'p95':>8}"
+            f"{f'page {args.pages} p50':>13}{'ILIKE p50':>11}"
+        )
+        with session_factory() as session:
+            for label, query in _QUERIES:
+                first = search_tickets(session, 1, query, args.limit)
+
+                def deep_page() -> None:
+                    page = search_tickets(session, 1, query, args.limit)
+                    for _ in range(args.pages - 1):
+                        if page.next_cursor is None:
+                            break
+                        page = search_tickets(
+                            session, 1, query, args.limit, page.next_cursor
+                        )
+
+                pattern = f"%{query}%"
+                scan = (
+                    select(AiTicket)
+                    .where(
+                        or_(AiTicket.title.ilike(pattern), AiTicket.body.ilike(pattern))
+                    )
+                    .order_by(desc(AiTicket.id))
+                    .limit(args.limit)
+                )
+                first_p50, first_p95 = _timed(
+                    lambda: search_tickets(session, 1, query, args.limit),
+                    args.repeat,
+                )
+                deep_p50, _ = _timed(deep_page, args.repeat)
+                scan_p50, _ = _timed(
+                    lambda: session.scalars(scan).all(), max(args.repeat // 4, 1)
+                )
+                print(
+                    f"{label:<14}{first.mode.value:>10}{len(first.hits):>6}"
+                    f"{first_p50:>10.1f}ms{first_p95:>6.1f}ms"
+                    f"{deep_p50:>11.1f}ms{scan_p50:>9.1f}ms"
+                )
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,336 @@
+"""Check every API route against its declared query and memory budget.
+
+Seeds a temporary SQLite database with a large dataset for the demo
+partner, calls each route registered in ``app.api.router.api_router`` once
+to warm up and once measured, counting SQL statements with engine events
+and peak allocations with tracemalloc. Requests go straight to the ASGI app
+and response bodies are discarded as they arrive, so streamed exports are
+measured without a client buffering them. Exits with status 1 and a
+readable diff when a route exceeds its ``@route_budget`` or declares none.
+
+Run from the ``backend`` directory::
+
+    python -m benchmarks.check_route_budgets --outlets 200 --days 365
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import sys
+import tempfile
+import tracemalloc
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any
+from urllib.parse import urlencode
+
+from sqlalchemy import Engine, event, insert
+
+_emails = itertools.count(1)
+_ADMIN_KEY = "route-budget-check"
+
+
+@dataclass(frozen=True)
+class Measurement:
+    """Observed cost of one request to a route."""
+
+    route: str
+    status_code: int
+    queries: int
+    peak_kib: int
+
+
+def _requests(today: date) -> dict[str, Callable[[], dict[str, Any]]]:
+    """Return request arguments for routes that need a body or parameters."""
+
+    return {
+        "POST /auth/login": lambda: {
+            "data": {"username": "demo@portal.app", "password": "demo1234"}
+        },
+        "POST /auth/register": lambda: {
+            "json": {
+                "email": f"budget{next(_emails)}@portal.app",
+                "full_name": "Budget Check",
+                "password": "budget1234",
+            }
+        },
+        "POST /admin/provision": lambda: {
+            "json": {
+                "partners": [
+                    {
+                        "name": "Budget Partner",
+                        "outlets": [{"external_id": "BUDGET-1", "name": "Точка"}],
+                        "users": [
+                            {
+                                "email": f"budget{next(_emails)}@portal.app",
+                                "full_name": "Budget Check",
+                                "password": "budget1234",
+                            }
+                            for _ in range(3)
+                        ],
+                    }
+                ]
+            }
+        },
+        "POST /franchise/ledger": lambda: {
+            "json": {"category": "royalty", "kind": "payment", "amount": 100}
+        },
+        "GET /dashboard/ai-tickets": lambda: {"params": {"limit": 100}},
+        "GET /reports/ai-tickets": lambda: {
+            "params": {
+                "date_from": (today - timedelta(days=30)).isoformat(),
+                "date_to": today.isoformat(),
+            }
+        },
+        "GET /search/tickets": lambda: {"params": {"q": "ФОТ поваров"}},
+        "GET /charts/range": lambda: {
+            "params": {
+                "date_from": (today - timedelta(days=90)).isoformat(),
+                "date_to": today.isoformat(),
+            }
+        },
+    }
+
+
+def _seed(session_factory, outlets: int, days: int, tickets: int) -> None:
+    """Add outlets with KPI history, tickets and ledger rows to partner 1."""
+
+    from app.models.ai_ticket import AiTicket, AiTicketSeverity, AiTicketStatus
+    from app.models.franchise_ledger import (
+        FranchiseChargeCategory,
+        FranchiseEntryKind,
+        FranchiseLedgerEntry,
+    )
+    from app.models.kpi import KpiDaily
+    from app.models.outlet import Outlet
+
+    rng = random.Random(3)
+    today = date.today()
+    with session_factory() as session:
+        outlet_ids = list(
+            session.scalars(
+                insert(Outlet).returning(Outlet.id),
+                [
+                    {"name": f"Точка №{index}", "partner_id": 1}
+                    for index in range(2, outlets + 1)
+                ],
+            )
+        )
+        for outlet_id in [1, *outlet_ids]:
+            session.execute(
+                insert(KpiDaily),
+                [
+                    {
+                        "outlet_id": outlet_id,
+                        "day": today - timedelta(days=offset),
+                        "revenue": rng.uniform(80000, 130000),
+                        "plan_percent": rng.uniform(80, 110),
+                        "labor_cost_percent": rng.uniform(25, 35),
+                        "food_cost_percent": rng.uniform(25, 35),
+                        "profit_forecast": 0.0,
+                        "checks": rng.randint(60, 120),
+                        "lfl_percent": rng.uniform(-5, 5),
+                    }
+                    for offset in range(7, days)
+                ],
+            )
+        session.execute(
+            insert(AiTicket),
+            [
+                {
+                    "outlet_id": rng.choice(outlet_ids) if index % 10 else 1,
+                    "severity": rng.choice(list(AiTicketSeverity)),
+                    "status": AiTicketStatus.done,
+                    "title": "ФОТ превышен",
+                    "body": "ФОТ превышен на 15%. Вчера вышло 5 поваров.",
+                    "action_label": "Исправить график",
+                }
+                for index in range(tickets)
+            ],
+        )
+        session.execute(
+            insert(FranchiseLedgerEntry),
+            [
+                {
+                    "outlet_id": 1,
+                    "category": rng.choice(list(FranchiseChargeCategory)),
+                    "kind": FranchiseEntryKind.accrual,
+                    "amount": 1000.0,
+                    "posted_on": today - timedelta(days=index % days),
+                }
+                for index in range(days * 3)
+            ],
+        )
+        session.commit()
+
+
+def _measure(app, route: str, kwargs: dict[str, Any], token: str) -> Measurement:
+    """Send one request and record its statement count and memory peak."""
+
+    from app.core.response_cache import get_response_cache
+
+    statements = 0
+
+    def count(*args: Any) -> None:
+        nonlocal statements
+        statements += 1
+
+    get_response_cache.cache_clear()
+    event.listen(Engine, "before_cursor_execute", count)
+    tracemalloc.reset_peak()
+    baseline = tracemalloc.get_traced_memory()[0]
+    try:
+        status_code = asyncio.run(_call(app, route, kwargs, token))
+    finally:
+        peak = tracemalloc.get_traced_memory()[1] - baseline
+        event.remove(Engine, "before_cursor_execute", count)
+    return Measurement(route, status_code, statements, peak // 1024)
+
+
+async def _call(app, route: str, kwargs: dict[str, Any], token: str) -> int:
+    """Run one request through the ASGI app, discarding the response body."""
+
+    method, path = route.split(" ", 1)
+    headers = {
+        "authorization": f"Bearer {token}",
+        "accept-encoding": "gzip, br",
+        "x-admin-key": _ADMIN_KEY,
+    }
+    body = b""
+    if "json" in kwargs:
+        body = json.dumps(kwargs["json"]).encode()
+        headers["content-type"] = "application/json"
+    elif "data" in kwargs:
+        body = urlencode(kwargs["data"]).encode()
+        headers["content-type"] = "application/x-www-form-urlencoded"
+    headers["content-length"] = str(len(body))
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": urlencode(kwargs.get("params", {})).encode(),
+        "headers": [(name.encode(), value.encode()) for name, value in headers.items()],
+        "client": ("127.0.0.1", 50000),
+        "server": ("testserver", 80),
+    }
+    status_code = 0
+    sent = False
+
+    async def receive() -> dict[str, Any]:
+        nonlocal sent
+        if sent:
+            await asyncio.Future()  # the client never disconnects
+        sent = True
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message: dict[str, Any]) -> None:
+        nonlocal status_code
+        if message["type"] == "http.response.start":
+            status_code = message["status"]
+
+    await app(scope, receive, send)
+    return status_code
+
+
+def _report(measurements: list[Measurement], budgets: dict[str, Any]) -> list[str]:
+    """Print a budget table and return one line per violation."""
+
+    print(
+        f"{'route':<28}{'status':>7}{'queries':>9}{'budget':>8}"
+        f"{'peak KiB':>10}{'budget':>8}"
+    )
+    violations: list[str] = []
+    for item in measurements:
+        budget = budgets[item.route]
+        print(
+            f"{item.route:<28}{item.status_code:>7}{item.queries:>9}"
+            f"{budget.queries if budget else '-':>8}{item.peak_kib:>10}"
+            f"{budget.peak_kib if budget else '-':>8}"
+        )
+        if item.status_code >= 400:
+            violations.append(f"{item.route}: responded {item.status_code}")
+        if budget is None:
+            violations.append(f"{item.route}: no @route_budget declared")
+            continue
+        if item.queries > budget.queries:
+            violations.append(
+                f"{item.route}: queries {item.queries} > {budget.queries} "
+                f"(+{item.queries - budget.queries})"
+            )
+        if item.peak_kib > budget.peak_kib:
+            violations.append(
+                f"{item.route}: peak {item.peak_kib} KiB > {budget.peak_kib} KiB "
+                f"(+{item.peak_kib - budget.peak_kib} KiB)"
+            )
+    return violations
+
+
+def main() -> None:
+    """Seed the dataset, measure every route and exit 1 on violations."""
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--outlets", type=int, default=200)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--tickets", type=int, default=20000)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="route-budgets-")
+    os.environ["DATABASE_URL"] = f"sqlite:///{Path(workdir) / 'budgets.db'}"
+    os.environ["DATABASE_SHARDS"] = ""
+    os.environ["SHARD_ROUTE_TTL_SECONDS"] = "3600"
+    os.environ["KPI_STORE_ENABLED"] = "false"
+    os.environ["ADMIN_API_KEY"] = _ADMIN_KEY
+
+    from fastapi.routing import APIRoute
+
+    from app.api.budgets import get_route_budget
+    from app.api.router import api_router
+    from app.core.security import create_access_token
+    from app.db.session import SessionLocal
+    from app.main import create_app, init_db_with_retry
+
+    init_db_with_retry(max_attempts=1)
+    _seed(SessionLocal, args.outlets, args.days, args.tickets)
+
+    requests = _requests(date.today())
+    routes = {
+        f"{method} {route.path}": route
+        for route in api_router.routes
+        if isinstance(route, APIRoute)
+        for method in sorted(route.methods)
+    }
+    budgets = {name: get_route_budget(route.endpoint) for name, route in routes.items()}
+
+    app = create_app(init_database=False)
+    token = create_access_token(subject="demo@portal.app", partner_id=1)
+    tracemalloc.start()
+    measurements = []
+    for route in routes:
+        build = requests.get(route, dict)
+        _measure(app, route, build(), token)
+        measurements.append(_measure(app, route, build(), token))
+    tracemalloc.stop()
+
+    violations = _report(measurements, budgets)
+    if violations:
+        print("\nRoute budgets exceeded:")
+        for line in violations:
+            print(f"  {line}")
+        sys.exit(1)
+    print("\nAll routes within budget.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,54 @@
+"use client";
+
+import { useRouter } from "next/navigation";
+import { useState } from "react";
+
 import Sidebar from "@/components/Sidebar";
 import ScaledFrame from "@/components/ScaledFrame";
+import { downloadExport } from "@/lib/api";
+import type { ExportFormat, ExportKind } from "@/lib/api";
 
 import styles from "../dashboard/Dashboard.module.css";
 
+const EXPORTS: { kind: ExportKind; label: string }[] = [
+  { kind: "kpis", label: "Показатели по дням" },
+  { kind: "ai-tickets", label: "AI-рекомендации" },
+];
+
 export default function ReportsPage() {
+  const router = useRouter();
+  const [error, setError] = useState<string | null>(null);
+
+  function handleDownload(kind: ExportKind, format: ExportFormat) {
+    const token = window.localStorage.getItem("portal_token");
+    if (!token) {
+      router.push("/login");
+      return;
+    }
+    setError(null);
+    downloadExport(token, kind, format).catch((err: Error) =>
+      setError(err.message),
+    );
+  }
+
   return (
     <main className={styles.page}>
       <ScaledFrame>
         <Sidebar currentPath="/reports" />
         <div className={styles.contentArea}>
           <h1>Отчеты</h1>
-          <p>Страница отчетов в разработке.</p>
+          {EXPORTS.map(({ kind, label }) => (
+            <p key={kind}>
+              {label}:{" "}
+              <button type="button" onClick={() => handleDownload(kind, "csv")}>
+                CSV
+              </button>{" "}
+              <button type="button" onClick={() => handleDownload(kind, "xlsx")}>
+                XLSX
+              </button>
+            </p>
+          ))}
+          {error && <p>{error}</p>}
         </div>
       </ScaledFrame>
     </main>
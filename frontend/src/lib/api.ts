@@ -58,3 +58,28 @@ export function fetchWeeklyChart(token: string): Promise<WeeklyChartPoint[]> {
 export function fetchCurrentUser(token: string): Promise<UserProfile> {
   return request<UserProfile>("/auth/me", token);
 }
+
+export type ExportKind = "kpis" | "ai-tickets";
+export type ExportFormat = "csv" | "xlsx";
+
+export async function downloadExport(
+  token: string,
+  kind: ExportKind,
+  format: ExportFormat,
+): Promise<void> {
+  const response = await fetch(
+    `${getApiBaseUrl()}/reports/${kind}?format=${format}`,
+    { headers: { Authorization: `Bearer ${token}` } },
+  );
+
+  if (!response.ok) {
+    throw new Error(`Ошибка запроса: ${response.status}`);
+  }
+
+  const url = URL.createObjectURL(await response.blob());
+  const link = document.createElement("a");
+  link.href = url;
+  link.download = `${kind}.${format}`;
+  link.click();
+  URL.revokeObjectURL(url);
+}